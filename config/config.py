@@ -13,6 +13,7 @@ class LLMConfig(BaseModel):
     api_key: Optional[str] = "YOUR_OPENAI_API_KEY_HERE"  # Replace with your actual OpenAI API key
     max_tokens: int = 4000  # Maximum response tokens
     temperature: float = 0.2  # Response randomness (0.0 to 1.0)
+    max_concurrent_requests: int = 8  # Maximum number of element-level LLM requests in flight at once
     
     def __init__(self, **data):
         super().__init__(**data)
@@ -34,6 +35,8 @@ class ParserConfig(BaseModel):
     overlap: int = 500  # Overlap between chunks to maintain context
     preserve_tables: bool = True  # Whether to preserve tables in parsing
     extract_images: bool = False  # Whether to extract and analyze images
+    pdf_backend: str = "pypdfium2"  # PDF text extraction backend ("pypdfium2" or "pypdf2")
+    cache_dir: Optional[str] = None  # Directory for cached parse results (None disables caching)
 
 class SectionTypes(BaseModel):
     """Defines the possible section types for classification."""
@@ -70,6 +73,7 @@ class ElementExtractionConfig(BaseModel):
     extract_monetary_values: bool = True  # Whether to extract monetary values
     extract_references: bool = True  # Whether to extract references
     analyze_relationships: bool = True  # Whether to analyze relationships between elements
+    cache_dir: Optional[str] = None  # Directory for cached LLM extraction, classification and intent analysis results (None disables caching)
 
 class AppConfig(BaseModel):
     """Main application configuration."""
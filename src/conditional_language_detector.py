@@ -5,6 +5,7 @@ Conditional language detector module for identifying conditions in policy langua
 import json
 import re
 from typing import Dict, List, Optional, Any
+from src.llm_response import clean_json_response
 
 class ConditionalLanguageDetector:
     """Detects and analyzes conditional language in policy elements."""
@@ -252,7 +253,7 @@ class ConditionalLanguageDetector:
         
         # Parse the response
         try:
-            cleaned_response = self._clean_json_response(response)
+            cleaned_response = clean_json_response(response)
             conditional_analysis = json.loads(cleaned_response)
             return conditional_analysis
         except json.JSONDecodeError as e:
@@ -265,24 +266,4 @@ class ConditionalLanguageDetector:
                 "has_complex_conditions": False,
                 "condition_count": 0,
                 "confidence": 0.0
-            }
-    
-    def _clean_json_response(self, response: str) -> str:
-        """
-        Clean LLM response to extract valid JSON.
-        
-        Args:
-            response: Raw LLM response
-            
-        Returns:
-            Cleaned JSON string
-        """
-        response = response.strip()
-        
-        # Remove markdown code blocks if present
-        if response.startswith('```json') and response.endswith('```'):
-            response = response[7:-3].strip()
-        elif response.startswith('```') and response.endswith('```'):
-            response = response[3:-3].strip()
-            
-        return response
\ No newline at end of file
+            }
\ No newline at end of file
@@ -4,9 +4,119 @@ Conflict identifier module for the Policy DNA Extractor.
 This module identifies potential conflicts or contradictions in policy language.
 """
 
+import os
 import re
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Set, Tuple, Optional
 
+from src.element_mapper import index_elements_by_id
+
+# Qualifiers that may change the meaning of a defined term
+TERM_USAGE_MODIFIERS = ("not", "except", "excluding", "other than", "subject to", "notwithstanding")
+
+def _term_usage_pattern(term: str) -> "re.Pattern":
+    """
+    Compile the pattern matching a defined term preceded by any usage modifier.
+    
+    Args:
+        term: The defined term
+        
+    Returns:
+        Compiled case-insensitive pattern
+    """
+    modifiers = '|'.join(re.escape(modifier) for modifier in TERM_USAGE_MODIFIERS)
+    return re.compile(rf'(?:{modifiers})\s+(?:[a-z\s]+\s+)?{re.escape(term)}', re.IGNORECASE)
+
+def _scan_term_usage(element_texts: List[Tuple[int, str]], terms: List[str]) -> List[Tuple[int, str]]:
+    """
+    Find defined terms used with qualifiers that may change their meaning.
+    
+    Kept at module level so it can be run in worker processes.
+    
+    Args:
+        element_texts: List of (element index, element text) tuples
+        terms: Defined terms (lowercase)
+        
+    Returns:
+        List of (element index, term) tuples for potentially inconsistent usages
+    """
+    usages = []
+    # Patterns are compiled once per scan, only for terms that occur in some text
+    patterns = {}
+    
+    for index, text in element_texts:
+        text_lower = text.lower()
+        for term in terms:
+            if term not in text_lower:
+                continue
+            pattern = patterns.get(term)
+            if pattern is None:
+                pattern = patterns[term] = _term_usage_pattern(term)
+            if pattern.search(text) is not None:
+                usages.append((index, term))
+    
+    return usages
+
+class ConflictRecord:
+    """Represents a potential conflict between policy elements."""
+    
+    __slots__ = (
+        'conflict_type', 'conflicting_elements', 'target_element', 'chain', 'term',
+        'elements', 'description', 'common_keywords', 'dependency_ids', 'severity', 'conflict_id'
+    )
+    
+    def __init__(
+        self,
+        conflict_type: str,
+        description: str,
+        severity: float,
+        conflicting_elements: Optional[List[Dict]] = None,
+        target_element: Optional[Dict] = None,
+        chain: Optional[Dict] = None,
+        term: Optional[str] = None,
+        elements: Optional[List] = None,
+        common_keywords: Optional[List[str]] = None,
+        dependency_ids: Optional[List[str]] = None,
+        conflict_id: Optional[str] = None
+    ):
+        """
+        Initialize a conflict record.
+        
+        Args:
+            conflict_type: Type of conflict (key of ConflictIdentifier.conflict_patterns)
+            description: Human-readable description of the conflict
+            severity: Severity score (0.0 to 1.0)
+            conflicting_elements: Summaries of the elements involved
+            target_element: Summary of the element targeted by conflicting dependencies
+            chain: Dependency chain for circular references
+            term: Defined term used inconsistently
+            elements: Elements from an interpretation challenge
+            common_keywords: Keywords shared by the conflicting elements
+            dependency_ids: IDs of the conflicting dependencies
+            conflict_id: Conflict ID for tracking
+        """
+        self.conflict_type = conflict_type
+        self.conflicting_elements = conflicting_elements
+        self.target_element = target_element
+        self.chain = chain
+        self.term = term
+        self.elements = elements
+        self.description = description
+        self.common_keywords = common_keywords
+        self.dependency_ids = dependency_ids
+        self.severity = severity
+        self.conflict_id = conflict_id
+    
+    def to_dict(self) -> Dict:
+        """Convert to dictionary representation, omitting unset fields."""
+        return {
+            field: getattr(self, field)
+            for field in self.__slots__
+            if getattr(self, field) is not None
+        }
+
 class ConflictIdentifier:
     """
     Identifies potential conflicts or contradictions between policy elements.
@@ -49,24 +159,35 @@ class ConflictIdentifier:
                 'description': 'Unclear precedence between conflicting provisions'
             }
         }
+        
+        # Element count above which definition usage is scanned in worker processes
+        self.parallel_scan_threshold = 2000
+        # Elements per worker task, large enough to amortize pickling cost
+        self.scan_chunk_size = 256
     
-    def identify_conflicts(self, document_map: Dict, dependencies_data: Dict) -> Dict:
+    def identify_conflicts(self, document_map: Dict, dependencies_data: Dict,
+                           elements_by_id: Optional[Dict[str, Dict]] = None) -> Dict:
         """
         Identify potential conflicts in the policy.
         
         Args:
             document_map: Complete document map with elements and language analysis
             dependencies_data: Output from DependencyAnalyzer
+            elements_by_id: Optional index of the document map's elements by ID,
+                built from the document map if not provided
             
         Returns:
             Dictionary containing conflict analysis results
         """
+        if elements_by_id is None:
+            elements_by_id = index_elements_by_id(document_map.get('elements', []))
+        
         print("  Identifying dependency conflicts...")
-        dependency_conflicts = self._identify_dependency_conflicts(document_map, dependencies_data)
+        dependency_conflicts = self._identify_dependency_conflicts(document_map, dependencies_data, elements_by_id)
         print(f"  Found {len(dependency_conflicts)} dependency conflicts")
         
         print("  Identifying semantic conflicts...")
-        semantic_conflicts = self._identify_semantic_conflicts(document_map)
+        semantic_conflicts = self._identify_semantic_conflicts(document_map, elements_by_id)
         print(f"  Found {len(semantic_conflicts)} semantic conflicts")
         
         print("  Identifying circular references...")
@@ -78,33 +199,35 @@ class ConflictIdentifier:
         
         # Add conflict IDs for tracking
         for i, conflict in enumerate(all_conflicts):
-            conflict['conflict_id'] = f"CONFLICT-{i+1:04d}"
+            conflict.conflict_id = f"CONFLICT-{i+1:04d}"
         
         # Sort conflicts by severity
-        sorted_conflicts = sorted(all_conflicts, key=lambda c: c.get('severity', 0), reverse=True)
+        sorted_conflicts = sorted(all_conflicts, key=lambda c: c.severity or 0, reverse=True)
         
         # Count conflict types
         conflict_type_counts = {}
         for conflict in sorted_conflicts:
-            conflict_type = conflict.get('conflict_type', 'unknown')
+            conflict_type = conflict.conflict_type or 'unknown'
             conflict_type_counts[conflict_type] = conflict_type_counts.get(conflict_type, 0) + 1
         
         # Create final result
         result = {
-            "conflicts": sorted_conflicts,
+            "conflicts": [conflict.to_dict() for conflict in sorted_conflicts],
             "conflict_type_counts": conflict_type_counts,
             "total_conflicts": len(sorted_conflicts)
         }
         
         return result
     
-    def _identify_dependency_conflicts(self, document_map: Dict, dependencies_data: Dict) -> List[Dict]:
+    def _identify_dependency_conflicts(self, document_map: Dict, dependencies_data: Dict,
+                                      elements_by_id: Dict[str, Dict]) -> List[ConflictRecord]:
         """
         Identify conflicts based on contradictory dependencies.
         
         Args:
             document_map: Document map with elements
             dependencies_data: Output from DependencyAnalyzer
+            elements_by_id: Dictionary of elements by ID
             
         Returns:
             List of dependency conflicts
@@ -115,29 +238,22 @@ class ConflictIdentifier:
         if not dependencies_data or 'dependencies' not in dependencies_data:
             return conflicts
         
-        # Get elements for lookup
-        elements_by_id = {}
-        for element in document_map.get('elements', []):
-            element_id = element.get('id')
-            if element_id:
-                elements_by_id[element_id] = element
-        
-        # Group dependencies by target element
-        target_dependencies = {}
+        # Group dependencies by target element, interning the dependency type
+        # once so the pairwise comparisons below hash and compare by identity
+        target_dependencies = defaultdict(list)
         for dep in dependencies_data.get('dependencies', []):
             target_id = dep.get('target_id')
             
             if target_id and target_id in elements_by_id:
-                if target_id not in target_dependencies:
-                    target_dependencies[target_id] = []
-                target_dependencies[target_id].append(dep)
+                target_dependencies[target_id].append((sys.intern(dep.get('dependency_type') or ''), dep))
         
-        # Define conflicting dependency types
-        conflicting_pairs = [
+        # Define conflicting dependency types (both orderings, for a single set lookup)
+        conflicting_pairs = {
             ('extends', 'restricts'),
             ('modifies', 'restricts'),
             ('requires', 'restricts')
-        ]
+        }
+        conflicting_pairs |= {(second, first) for first, second in conflicting_pairs}
         
         # Check each target with multiple dependencies
         for target_id, deps in target_dependencies.items():
@@ -147,16 +263,10 @@ class ConflictIdentifier:
             target_element = elements_by_id.get(target_id)
             
             # Check all pairs of dependencies
-            for i, dep1 in enumerate(deps):
-                for dep2 in deps[i+1:]:
-                    dep1_type = dep1.get('dependency_type', '')
-                    dep2_type = dep2.get('dependency_type', '')
-                    
+            for i, (dep1_type, dep1) in enumerate(deps):
+                for dep2_type, dep2 in deps[i+1:]:
                     # Check if dependency types conflict
-                    is_conflicting = (dep1_type, dep2_type) in conflicting_pairs or \
-                                    (dep2_type, dep1_type) in conflicting_pairs
-                    
-                    if is_conflicting:
+                    if (dep1_type, dep2_type) in conflicting_pairs:
                         source1_id = dep1.get('source_id')
                         source2_id = dep2.get('source_id')
                         
@@ -175,9 +285,9 @@ class ConflictIdentifier:
                             conflict_type = 'condition_exclusion_conflict'
                         
                         # Create conflict record
-                        conflict = {
-                            'conflict_type': conflict_type,
-                            'conflicting_elements': [
+                        conflict = ConflictRecord(
+                            conflict_type=conflict_type,
+                            conflicting_elements=[
                                 {
                                     'element_id': source1_id,
                                     'element_type': source1.get('type', ''),
@@ -189,26 +299,27 @@ class ConflictIdentifier:
                                     'element_text': source2.get('text', '')[:150] + '...'
                                 }
                             ],
-                            'target_element': {
+                            target_element={
                                 'element_id': target_id,
                                 'element_type': target_element.get('type', ''),
                                 'element_text': target_element.get('text', '')[:150] + '...'
                             },
-                            'description': f"Conflicting dependencies: {dep1_type} vs {dep2_type} on same target",
-                            'dependency_ids': [dep1.get('dependency_id'), dep2.get('dependency_id')],
-                            'severity': self.conflict_patterns.get(conflict_type, {}).get('weight', 0.7)
-                        }
+                            description=f"Conflicting dependencies: {dep1_type} vs {dep2_type} on same target",
+                            dependency_ids=[dep1.get('dependency_id'), dep2.get('dependency_id')],
+                            severity=self.conflict_patterns.get(conflict_type, {}).get('weight', 0.7)
+                        )
                         
                         conflicts.append(conflict)
         
         return conflicts
     
-    def _identify_semantic_conflicts(self, document_map: Dict) -> List[Dict]:
+    def _identify_semantic_conflicts(self, document_map: Dict, elements_by_id: Dict[str, Dict]) -> List[ConflictRecord]:
         """
         Identify semantic conflicts using language analysis.
         
         Args:
             document_map: Document map with language analysis
+            elements_by_id: Dictionary of elements by ID
             
         Returns:
             List of semantic conflicts
@@ -224,21 +335,12 @@ class ConflictIdentifier:
                 return self._convert_challenges_to_conflicts(document_map['language_insights']['interpretation_challenges'])
             return conflicts
         
-        # Extract elements by ID for lookup
-        elements_by_id = {}
-        for element in elements:
-            element_id = element.get('id')
-            if element_id:
-                elements_by_id[element_id] = element
-        
         # Group elements by type for analysis
-        elements_by_type = {}
+        elements_by_type = defaultdict(list)
         for element in elements:
             element_type = element.get('type')
             if element_type:
-                if element_type not in elements_by_type:
-                    elements_by_type[element_type] = []
-                elements_by_type[element_type].append(element)
+                elements_by_type[sys.intern(element_type)].append(element)
         
         # Identify conflicts between coverage grants and exclusions
         self._analyze_coverage_exclusion_conflicts(
@@ -279,6 +381,10 @@ class ConflictIdentifier:
         if not coverage_elements or not exclusion_elements:
             return
         
+        # The exclusions and instructions form a fixed prompt prefix shared by
+        # every batch, so the provider's prompt cache can reuse it
+        exclusion_context = self._create_exclusion_context(exclusion_elements)
+        
         # Process in batches to handle larger documents
         batch_size = min(5, len(coverage_elements))
         for i in range(0, len(coverage_elements), batch_size):
@@ -286,7 +392,7 @@ class ConflictIdentifier:
             coverage_batch = coverage_elements[i:i+batch_size]
             
             # Use LLM to identify conflicts
-            prompt = self._create_conflict_analysis_prompt(coverage_batch, exclusion_elements)
+            prompt = self._create_conflict_analysis_prompt(coverage_batch, exclusion_context)
             
             try:
                 results = self.llm_client.call_llm_with_structured_output(
@@ -321,9 +427,9 @@ class ConflictIdentifier:
                         exclusion = elements_by_id.get(exclusion_id)
                         
                         if coverage and exclusion:
-                            conflicts.append({
-                                'conflict_type': 'contradicting_provisions',
-                                'conflicting_elements': [
+                            conflicts.append(ConflictRecord(
+                                conflict_type='contradicting_provisions',
+                                conflicting_elements=[
                                     {
                                         'element_id': coverage_id,
                                         'element_type': 'COVERAGE_GRANT',
@@ -335,9 +441,9 @@ class ConflictIdentifier:
                                         'element_text': exclusion.get('text', '')[:150] + '...'
                                     }
                                 ],
-                                'description': conflict.get("description", "Potential conflict between coverage grant and exclusion"),
-                                'severity': conflict.get("severity", 0.8)
-                            })
+                                description=conflict.get("description", "Potential conflict between coverage grant and exclusion"),
+                                severity=conflict.get("severity", 0.8)
+                            ))
             
             except Exception as e:
                 print(f"  Error analyzing coverage-exclusion conflicts: {str(e)}")
@@ -355,24 +461,34 @@ class ConflictIdentifier:
         if not extension_elements or not exclusion_elements:
             return
         
+        # Lowercase keyword sets are built once per element; elements without
+        # keywords can never overlap, so they are dropped up front
+        extension_keywords = [
+            (extension, frozenset(k.lower() for k in extension.get('keywords', [])))
+            for extension in extension_elements
+        ]
+        extension_keywords = [(e, keywords) for e, keywords in extension_keywords if keywords]
+        
+        exclusion_keywords = [
+            (exclusion, frozenset(k.lower() for k in exclusion.get('keywords', [])))
+            for exclusion in exclusion_elements
+        ]
+        exclusion_keywords = [(e, keywords) for e, keywords in exclusion_keywords if keywords]
+        
         # Simple keyword-based approach for demonstration
-        for extension in extension_elements:
+        for extension, extension_kw in extension_keywords:
             extension_id = extension.get('id')
-            extension_text = extension.get('text', '').lower()
-            extension_keywords = extension.get('keywords', [])
             
-            for exclusion in exclusion_elements:
+            for exclusion, exclusion_kw in exclusion_keywords:
                 exclusion_id = exclusion.get('id')
-                exclusion_text = exclusion.get('text', '').lower()
-                exclusion_keywords = exclusion.get('keywords', [])
                 
                 # Check for keyword overlap
-                common_keywords = set(k.lower() for k in extension_keywords) & set(k.lower() for k in exclusion_keywords)
+                common_keywords = extension_kw & exclusion_kw
                 
                 if common_keywords:
-                    conflicts.append({
-                        'conflict_type': 'extension_exclusion_conflict',
-                        'conflicting_elements': [
+                    conflicts.append(ConflictRecord(
+                        conflict_type='extension_exclusion_conflict',
+                        conflicting_elements=[
                             {
                                 'element_id': extension_id,
                                 'element_type': 'EXTENSION',
@@ -384,10 +500,10 @@ class ConflictIdentifier:
                                 'element_text': exclusion.get('text', '')[:150] + '...'
                             }
                         ],
-                        'description': f"Potential conflict between extension and exclusion (common terms: {', '.join(common_keywords)})",
-                        'common_keywords': list(common_keywords),
-                        'severity': 0.7
-                    })
+                        description=f"Potential conflict between extension and exclusion (common terms: {', '.join(common_keywords)})",
+                        common_keywords=list(common_keywords),
+                        severity=0.7
+                    ))
     
     def _analyze_definition_conflicts(self, definition_elements, all_elements, conflicts, elements_by_id):
         """
@@ -417,69 +533,78 @@ class ConflictIdentifier:
                     'definition_text': definition_text
                 }
         
-        # Check for inconsistent usage of defined terms
-        for element in all_elements:
+        if not defined_terms:
+            return
+        
+        # Check for inconsistent usage of defined terms (skipping definitions)
+        element_texts = [
+            (i, element.get('text', ''))
+            for i, element in enumerate(all_elements)
+            if element.get('type') != 'DEFINITION'
+        ]
+        usages = self._scan_definition_usage(element_texts, list(defined_terms))
+        
+        for index, term in usages:
+            element = all_elements[index]
             element_id = element.get('id')
             element_type = element.get('type')
             element_text = element.get('text', '')
+            term_info = defined_terms[term]
             
-            # Skip definitions
-            if element_type == 'DEFINITION':
-                continue
-                
-            # Check for usage of defined terms
-            for term, term_info in defined_terms.items():
-                if term in element_text.lower():
-                    # Check if term is used inconsistently
-                    if self._check_inconsistent_term_usage(term, term_info['definition_text'], element_text):
-                        definition = elements_by_id.get(term_info['definition_id'])
-                        
-                        if definition:
-                            conflicts.append({
-                                'conflict_type': 'definition_mismatch',
-                                'conflicting_elements': [
-                                    {
-                                        'element_id': term_info['definition_id'],
-                                        'element_type': 'DEFINITION',
-                                        'element_text': definition.get('text', '')[:150] + '...'
-                                    },
-                                    {
-                                        'element_id': element_id,
-                                        'element_type': element_type,
-                                        'element_text': element_text[:150] + '...'
-                                    }
-                                ],
-                                'term': term,
-                                'description': f"Term '{term}' may be used inconsistently with its definition",
-                                'severity': 0.7
-                            })
+            definition = elements_by_id.get(term_info['definition_id'])
+            
+            if definition:
+                conflicts.append(ConflictRecord(
+                    conflict_type='definition_mismatch',
+                    conflicting_elements=[
+                        {
+                            'element_id': term_info['definition_id'],
+                            'element_type': 'DEFINITION',
+                            'element_text': definition.get('text', '')[:150] + '...'
+                        },
+                        {
+                            'element_id': element_id,
+                            'element_type': element_type,
+                            'element_text': element_text[:150] + '...'
+                        }
+                    ],
+                    term=term,
+                    description=f"Term '{term}' may be used inconsistently with its definition",
+                    severity=0.7
+                ))
     
-    def _check_inconsistent_term_usage(self, term, definition_text, usage_text):
+    def _scan_definition_usage(self, element_texts: List[Tuple[int, str]], terms: List[str]) -> List[Tuple[int, str]]:
         """
-        Check if a term is used inconsistently with its definition.
+        Scan element texts for inconsistent usage of defined terms.
+        
+        Large documents are split into chunks and scanned in worker processes;
+        results keep the order of the input elements.
         
         Args:
-            term: The defined term
-            definition_text: The definition text
-            usage_text: The text where the term is used
+            element_texts: List of (element index, element text) tuples
+            terms: Defined terms (lowercase)
             
         Returns:
-            True if potentially inconsistent, False otherwise
+            List of (element index, term) tuples for potentially inconsistent usages
         """
-        # This is a simplified implementation that could be improved with more sophisticated analysis
-        # For now, we'll check if the term is used with qualifiers that might change its meaning
-        
-        term_pattern = re.escape(term)
-        modifiers = ["not", "except", "excluding", "other than", "subject to", "notwithstanding"]
-        
-        for modifier in modifiers:
-            # Check if the term is used with the modifier
-            if re.search(rf'{modifier}\s+(?:[a-z\s]+\s+)?{term_pattern}', usage_text, re.IGNORECASE):
-                return True
-        
-        return False
+        if len(element_texts) < self.parallel_scan_threshold:
+            return _scan_term_usage(element_texts, terms)
+        
+        chunk_size = self.scan_chunk_size
+        chunks = [element_texts[i:i+chunk_size] for i in range(0, len(element_texts), chunk_size)]
+        
+        try:
+            usages = []
+            max_workers = min(os.cpu_count() or 1, len(chunks))
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                for partial in executor.map(_scan_term_usage, chunks, [terms] * len(chunks)):
+                    usages.extend(partial)
+            return usages
+        except Exception as e:
+            print(f"  Error scanning definition usage in parallel, scanning serially: {str(e)}")
+            return _scan_term_usage(element_texts, terms)
     
-    def _identify_circular_references(self, dependencies_data: Dict) -> List[Dict]:
+    def _identify_circular_references(self, dependencies_data: Dict) -> List[ConflictRecord]:
         """
         Identify circular references in the dependency chains.
         
@@ -513,21 +638,21 @@ class ConflictIdentifier:
                 targets_start = any(dep.get('target_id') == start_node for dep in path)
                 
                 if targets_start:
-                    conflicts.append({
-                        'conflict_type': 'ambiguous_precedence',
-                        'chain': {
+                    conflicts.append(ConflictRecord(
+                        conflict_type='ambiguous_precedence',
+                        chain={
                             'start_node': start_node,
                             'end_node': end_node,
                             'path': path,
                             'length': chain.get('length', 0)
                         },
-                        'description': "Circular dependency creates ambiguous precedence",
-                        'severity': 0.6
-                    })
+                        description="Circular dependency creates ambiguous precedence",
+                        severity=0.6
+                    ))
         
         return conflicts
     
-    def _convert_challenges_to_conflicts(self, challenges: List[Dict]) -> List[Dict]:
+    def _convert_challenges_to_conflicts(self, challenges: List[Dict]) -> List[ConflictRecord]:
         """
         Convert interpretation challenges to conflicts.
         
@@ -540,42 +665,33 @@ class ConflictIdentifier:
         conflicts = []
         
         for i, challenge in enumerate(challenges):
-            conflicts.append({
-                'conflict_id': f"CONFLICT-AUTO-{i+1:04d}",
-                'conflict_type': 'contradicting_provisions',
-                'description': challenge.get('description', 'Potential interpretation challenge'),
-                'elements': challenge.get('elements', []),
-                'severity': 0.6
-            })
+            conflicts.append(ConflictRecord(
+                conflict_id=f"CONFLICT-AUTO-{i+1:04d}",
+                conflict_type='contradicting_provisions',
+                description=challenge.get('description', 'Potential interpretation challenge'),
+                elements=challenge.get('elements', []),
+                severity=0.6
+            ))
         
         return conflicts
     
-    def _create_conflict_analysis_prompt(self, coverage_elements, exclusion_elements):
+    def _create_exclusion_context(self, exclusion_elements):
         """
-        Create a prompt for conflict analysis.
+        Create the fixed part of the conflict analysis prompt.
+        
+        Holds the instructions, output format and exclusions, which are the
+        same for every coverage batch of a document.
         
         Args:
-            coverage_elements: Coverage grant elements
             exclusion_elements: Exclusion elements
             
         Returns:
-            Prompt for LLM
+            Prompt prefix for LLM
         """
         prompt = "I need to identify potential conflicts between coverage grants and exclusions in an insurance policy.\n\n"
         
-        # Format coverage elements
-        prompt += "COVERAGE GRANTS:\n"
-        for i, element in enumerate(coverage_elements):
-            prompt += f"Coverage {i+1} [ID: {element.get('id')}]: {element.get('text', '')[:250]}...\n\n"
-        
-        # Format exclusion elements (limit to avoid token limits)
-        max_exclusions = min(10, len(exclusion_elements))
-        prompt += "\nEXCLUSIONS:\n"
-        for i, element in enumerate(exclusion_elements[:max_exclusions]):
-            prompt += f"Exclusion {i+1} [ID: {element.get('id')}]: {element.get('text', '')[:250]}...\n\n"
-        
         # Define the task
-        prompt += "\nIdentify pairs of coverage grants and exclusions that may conflict with each other. "
+        prompt += "Identify pairs of coverage grants and exclusions that may conflict with each other. "
         prompt += "A conflict occurs when an exclusion appears to limit or negate coverage that a coverage grant provides, "
         prompt += "creating ambiguity about whether something is covered. "
         prompt += "Focus on substantive conflicts, not just overlapping terminology."
@@ -595,4 +711,30 @@ class ConflictIdentifier:
         }
         """
         
-        return prompt
\ No newline at end of file
+        # Format exclusion elements (limit to avoid token limits)
+        max_exclusions = min(10, len(exclusion_elements))
+        prompt += "\nEXCLUSIONS:\n"
+        for i, element in enumerate(exclusion_elements[:max_exclusions]):
+            prompt += f"Exclusion {i+1} [ID: {element.get('id')}]: {element.get('text', '')[:250]}...\n\n"
+        
+        return prompt
+    
+    def _create_conflict_analysis_prompt(self, coverage_elements, exclusion_context):
+        """
+        Create a prompt for conflict analysis.
+        
+        Args:
+            coverage_elements: Coverage grant elements
+            exclusion_context: Prompt prefix from _create_exclusion_context
+            
+        Returns:
+            Prompt for LLM
+        """
+        prompt = exclusion_context
+        
+        # Format coverage elements (the only part that varies between batches)
+        prompt += "\nCOVERAGE GRANTS:\n"
+        for i, element in enumerate(coverage_elements):
+            prompt += f"Coverage {i+1} [ID: {element.get('id')}]: {element.get('text', '')[:250]}...\n\n"
+        
+        return prompt
@@ -4,13 +4,83 @@ Dependency analyzer module for the Policy DNA Extractor.
 This module analyzes logical dependencies between policy elements.
 """
 
+import bisect
+import heapq
+import itertools
+import os
 import re
-from typing import Dict, List, Tuple, Any, Optional
+import sys
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Tuple, Any, Optional
+
+from src.element_mapper import index_elements_by_id
+
+def _connect_elements_by_keywords(source_elements: List[Tuple], target_elements: List[Tuple],
+                                  dependency_type: str, keyword_vocabulary: List[str]) -> List[Dict]:
+    """
+    Connect source and target elements of one section based on keyword similarity.
+    
+    Kept at module level so it can be run in worker processes.
+    
+    Args:
+        source_elements: List of (element ID, keyword bitmask, lowercased keywords, lowercased text) tuples
+        target_elements: List of (element ID, keyword bitmask, lowercased keywords, lowercased text) tuples
+        dependency_type: Dependency type for connected elements
+        keyword_vocabulary: Sorted keywords of the section, indexed by bitmask bit
+        
+    Returns:
+        List of dependencies between source and target elements
+    """
+    dependencies = []
+    
+    for source_id, source_mask, source_keywords, _ in source_elements:
+        for target_id, target_mask, _, target_text in target_elements:
+            # Skip self-references
+            if source_id == target_id:
+                continue
+            
+            # Check for keyword matches, decoding common keywords lowest bit
+            # (first in sorted order) first
+            common_mask = source_mask & target_mask
+            common_keywords = []
+            while common_mask:
+                lowest_bit = common_mask & -common_mask
+                common_keywords.append(keyword_vocabulary[lowest_bit.bit_length() - 1])
+                common_mask ^= lowest_bit
+            
+            # Check for text similarity (simple keyword check)
+            text_similarity = 0
+            if source_keywords and target_text:
+                for keyword in source_keywords:
+                    if keyword in target_text:
+                        text_similarity += 1
+            
+            # Create dependency if sufficient similarity
+            if common_keywords or text_similarity > 0:
+                strength = min(0.5 + (len(common_keywords) * 0.1) + (text_similarity * 0.05), 0.9)
+                
+                dependencies.append({
+                    'source_id': source_id,
+                    'target_id': target_id,
+                    'dependency_type': dependency_type,
+                    'strength': round(strength, 2),
+                    'origin': 'element_type',
+                    'similarity_data': {
+                        'common_keywords': common_keywords,
+                        'text_similarity': text_similarity
+                    }
+                })
+    
+    return dependencies
 
 class DependencyAnalyzer:
     """
     Analyzes dependencies between policy elements based on references and semantics.
     """
+    # Words of four or more letters used to match conditions to elements (applied to lowercased text)
+    _TOKEN_RE = re.compile(r'\b[a-z]{4,}\b')
+    
     def __init__(self, config, llm_client):
         """
         Initialize the DependencyAnalyzer.
@@ -33,32 +103,72 @@ class DependencyAnalyzer:
             "clarifies": 0.4,        # One element explains another
             "weak_connection": 0.2   # Elements are related but no clear dependency
         }
+        
+        # Mapping of reference types to dependency types
+        self.reference_dependency_types = {
+            'explicit_section': 'references',
+            'defined_term': 'defines',
+            'semantic_dependency': 'references',
+            'unresolved_section': 'weak_connection'
+        }
+        
+        # Dependency type and weight per reference type, resolved once
+        self._reference_dependency_weights = {
+            reference_type: (dependency_type, self.dependency_types[dependency_type])
+            for reference_type, dependency_type in self.reference_dependency_types.items()
+        }
+        self._default_reference_dependency = ('references', self.dependency_types['references'])
+        
+        # Element pairs above which type dependencies are scored in worker processes
+        self.parallel_pair_threshold = 200000
     
-    def analyze_dependencies(self, document_map: Dict, references_data: Dict) -> Dict:
+    def analyze_dependencies(self, document_map: Dict, references_data: Dict,
+                             elements_by_id: Optional[Dict[str, Dict]] = None) -> Dict:
         """
         Analyze dependencies between policy elements based on references.
         
         Args:
             document_map: Complete document map with elements
             references_data: Output from ReferenceDetector
+            elements_by_id: Optional index of the document map's elements by ID,
+                built from the document map if not provided
             
         Returns:
             Dictionary containing dependency analysis results
         """
-        print("  Converting references to dependencies...")
-        reference_dependencies = self._convert_references_to_dependencies(references_data)
-        print(f"  Created {len(reference_dependencies)} reference-based dependencies")
-        
-        print("  Identifying element type dependencies...")
-        type_dependencies = self._identify_element_type_dependencies(document_map)
-        print(f"  Found {len(type_dependencies)} element type dependencies")
-        
-        print("  Analyzing conditional dependencies...")
-        conditional_dependencies = self._analyze_conditional_dependencies(document_map)
-        print(f"  Found {len(conditional_dependencies)} conditional dependencies")
+        # Intern IDs so the grouping, deduplication and graph dictionaries keyed
+        # on them can compare by identity
+        self._intern_ids(document_map.get('elements', []), ('id', 'section_id'))
+        self._intern_ids(document_map.get('elements_with_language_analysis', []), ('id',))
+        if references_data:
+            self._intern_ids(references_data.get('references', []), ('source_id', 'target_id'))
+        
+        if elements_by_id is None:
+            elements_by_id = index_elements_by_id(document_map.get('elements', []))
+        
+        # Lowercase element text once for all analyses (kept off the elements, which are serialized)
+        element_texts = {
+            element_id: element.get('text', '').lower() for element_id, element in elements_by_id.items()
+        }
         
-        # Combine all dependencies
-        all_dependencies = reference_dependencies + type_dependencies + conditional_dependencies
+        # Stream dependencies from each analysis straight into deduplication
+        all_dependencies = itertools.chain(
+            self._report_progress(
+                "Converting references to dependencies",
+                self._convert_references_to_dependencies(references_data),
+                "Created {} reference-based dependencies"
+            ),
+            self._report_progress(
+                "Identifying element type dependencies",
+                self._identify_element_type_dependencies(document_map, elements_by_id, element_texts),
+                "Found {} element type dependencies"
+            ),
+            self._report_progress(
+                "Analyzing conditional dependencies",
+                self._analyze_conditional_dependencies(document_map, element_texts),
+                "Found {} conditional dependencies"
+            )
+        )
         
         # Remove duplicates and resolve conflicts
         unique_dependencies = self._deduplicate_dependencies(all_dependencies)
@@ -86,42 +196,75 @@ class DependencyAnalyzer:
         
         return result
     
-    def _convert_references_to_dependencies(self, references_data: Dict) -> List[Dict]:
+    def _intern_ids(self, records: Iterable[Dict], fields: Tuple[str, ...]) -> None:
+        """
+        Intern ID strings of records in place.
+        
+        Args:
+            records: Elements or references to update
+            fields: Names of the ID fields to intern
+        """
+        for record in records:
+            for field in fields:
+                value = record.get(field)
+                if isinstance(value, str):
+                    record[field] = sys.intern(value)
+    
+    def _report_progress(self, description: str, dependencies: Iterable[Dict], summary: str) -> Iterator[Dict]:
+        """
+        Pass dependencies through, reporting when the analysis starts and how many it found.
+        
+        Args:
+            description: Description of the analysis step
+            dependencies: Dependencies produced by the analysis
+            summary: Summary message with a placeholder for the dependency count
+            
+        Yields:
+            Dependencies from the analysis
+        """
+        print(f"  {description}...")
+        
+        count = 0
+        for dependency in dependencies:
+            count += 1
+            yield dependency
+        
+        print(f"  {summary.format(count)}")
+    
+    def _convert_references_to_dependencies(self, references_data: Dict) -> Iterator[Dict]:
         """
         Convert reference data to dependency objects.
         
         Args:
             references_data: Output from ReferenceDetector
             
-        Returns:
-            List of dependencies derived from references
+        Yields:
+            Dependencies derived from references
         """
-        dependencies = []
-        
         # Skip if no references
         if not references_data or 'references' not in references_data:
-            return dependencies
+            return
+        
+        reference_dependency_weights = self._reference_dependency_weights
+        default_dependency = self._default_reference_dependency
         
         # Process each reference
         for ref in references_data['references']:
             source_id = ref.get('source_id')
             target_id = ref.get('target_id')
-            reference_type = ref.get('reference_type', '')
-            confidence = ref.get('confidence', 0.5)
             
             # Skip references with no target
             if not source_id or not target_id:
                 continue
             
-            # Map reference types to dependency types
-            dependency_type = self._map_reference_to_dependency_type(reference_type)
+            reference_type = ref.get('reference_type', '')
             
-            # Calculate dependency strength based on confidence and type
-            type_weight = self.dependency_types.get(dependency_type, 0.5)
-            strength = confidence * type_weight
+            # Map reference type to dependency type and calculate strength from confidence and type
+            dependency_type, type_weight = reference_dependency_weights.get(reference_type, default_dependency)
+            strength = ref.get('confidence', 0.5) * type_weight
             
             # Create dependency object
-            dependency = {
+            yield {
                 'source_id': source_id,
                 'target_id': target_id,
                 'dependency_type': dependency_type,
@@ -133,42 +276,20 @@ class DependencyAnalyzer:
                     'reference_text': ref.get('reference_text', '')
                 }
             }
-            
-            dependencies.append(dependency)
-        
-        return dependencies
     
-    def _map_reference_to_dependency_type(self, reference_type: str) -> str:
-        """
-        Map reference types to dependency types.
-        
-        Args:
-            reference_type: Type of reference
-            
-        Returns:
-            Corresponding dependency type
-        """
-        # Mapping of reference types to dependency types
-        mapping = {
-            'explicit_section': 'references',
-            'defined_term': 'defines',
-            'semantic_dependency': 'references',
-            'unresolved_section': 'weak_connection'
-        }
-        
-        return mapping.get(reference_type, 'references')
-    
-    def _identify_element_type_dependencies(self, document_map: Dict) -> List[Dict]:
+    def _identify_element_type_dependencies(self, document_map: Dict, elements_by_id: Dict[str, Dict],
+                                            element_texts: Dict[str, str]) -> Iterator[Dict]:
         """
         Identify dependencies based on element types and their relationships.
         
         Args:
             document_map: Document map with elements
+            elements_by_id: Dictionary of elements by ID
+            element_texts: Lowercased text of the elements in elements_by_id
             
-        Returns:
-            List of dependencies based on element types
+        Yields:
+            Dependencies based on element types
         """
-        dependencies = []
         elements = document_map.get('elements', [])
         
         # Define relationships between element types
@@ -181,94 +302,116 @@ class DependencyAnalyzer:
             ('DEFINITION', 'COVERAGE_GRANT', 'defines')
         ]
         
-        # Group elements by type and section
-        elements_by_type_and_section = {}
+        # Group elements by section
+        elements_by_section = defaultdict(list)
         for element in elements:
             element_type = element.get('type')
             section_id = element.get('section_id')
             
             if element_type and section_id:
-                key = (element_type, section_id)
-                if key not in elements_by_type_and_section:
-                    elements_by_type_and_section[key] = []
-                elements_by_type_and_section[key].append(element)
-        
-        # Find dependencies based on element types within the same section
-        for source_type, target_type, dependency_type in type_relationships:
-            # Check all sections for this type relationship
-            for section_id in set(s_id for _, s_id in elements_by_type_and_section.keys()):
-                source_elements = elements_by_type_and_section.get((source_type, section_id), [])
-                target_elements = elements_by_type_and_section.get((target_type, section_id), [])
+                elements_by_section[section_id].append(element)
+        
+        # Group elements by type and section, preparing keywords and lowercased text
+        # once per element rather than once per pair (kept off the element, which is serialized)
+        elements_by_type = defaultdict(lambda: defaultdict(list))
+        keyword_vocabularies = {}
+        for section_id, section_elements in elements_by_section.items():
+            # Number the section's keywords so keyword sets become integer bitmasks
+            vocabulary = sorted(set(
+                keyword for element in section_elements for keyword in element.get('keywords', [])
+            ))
+            keyword_bits = {keyword: 1 << bit for bit, keyword in enumerate(vocabulary)}
+            keyword_vocabularies[section_id] = vocabulary
+            
+            for element in section_elements:
+                keywords = element.get('keywords', [])
+                keyword_mask = 0
+                for keyword in keywords:
+                    keyword_mask |= keyword_bits[keyword]
                 
-                if not source_elements or not target_elements:
-                    continue
+                element_id = element.get('id')
+                if element_id in element_texts and elements_by_id[element_id] is element:
+                    element_text = element_texts[element_id]
+                else:
+                    element_text = element.get('text', '').lower()
                 
-                # Connect elements based on keyword similarity
-                for source in source_elements:
-                    source_id = source.get('id')
-                    source_text = source.get('text', '').lower()
-                    source_keywords = source.get('keywords', [])
-                    
-                    for target in target_elements:
-                        target_id = target.get('id')
-                        target_text = target.get('text', '').lower()
-                        target_keywords = target.get('keywords', [])
-                        
-                        # Skip self-references
-                        if source_id == target_id:
-                            continue
-                        
-                        # Check for keyword matches
-                        common_keywords = set(source_keywords) & set(target_keywords)
-                        
-                        # Check for text similarity (simple keyword check)
-                        text_similarity = 0
-                        if source_keywords and target_text:
-                            for keyword in source_keywords:
-                                if keyword.lower() in target_text:
-                                    text_similarity += 1
-                        
-                        # Create dependency if sufficient similarity
-                        if common_keywords or text_similarity > 0:
-                            strength = min(0.5 + (len(common_keywords) * 0.1) + (text_similarity * 0.05), 0.9)
-                            
-                            dependencies.append({
-                                'source_id': source_id,
-                                'target_id': target_id,
-                                'dependency_type': dependency_type,
-                                'strength': round(strength, 2),
-                                'origin': 'element_type',
-                                'similarity_data': {
-                                    'common_keywords': list(common_keywords),
-                                    'text_similarity': text_similarity
-                                }
-                            })
-        
-        return dependencies
+                elements_by_type[element.get('type')][section_id].append((
+                    element_id,
+                    keyword_mask,
+                    [keyword.lower() for keyword in keywords],
+                    element_text
+                ))
+        
+        # Each type relationship within a section is an independent task
+        tasks = []
+        for source_type, target_type, dependency_type in type_relationships:
+            source_sections = elements_by_type.get(source_type, {})
+            target_sections = elements_by_type.get(target_type, {})
+            
+            # Only sections containing both element types
+            for section_id, source_elements in source_sections.items():
+                target_elements = target_sections.get(section_id)
+                if target_elements:
+                    tasks.append((source_elements, target_elements, dependency_type, keyword_vocabularies[section_id]))
+        
+        # Connect elements based on keyword similarity
+        yield from self._connect_section_elements(tasks)
     
-    def _analyze_conditional_dependencies(self, document_map: Dict) -> List[Dict]:
+    def _connect_section_elements(self, tasks: List[Tuple]) -> Iterator[Dict]:
+        """
+        Run keyword-similarity tasks, in worker processes for large documents.
+        
+        Results keep the order of the tasks.
+        
+        Args:
+            tasks: List of (source elements, target elements, dependency type, keyword vocabulary) tuples
+            
+        Yields:
+            Dependencies based on element types
+        """
+        pair_count = sum(len(source_elements) * len(target_elements) for source_elements, target_elements, *_ in tasks)
+        
+        if len(tasks) > 1 and pair_count >= self.parallel_pair_threshold:
+            dependencies = None
+            try:
+                dependencies = []
+                max_workers = min(os.cpu_count() or 1, len(tasks))
+                chunk_size = max(1, len(tasks) // (max_workers * 4))
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    for partial in executor.map(_connect_elements_by_keywords, *zip(*tasks), chunksize=chunk_size):
+                        dependencies.extend(partial)
+            except Exception as e:
+                print(f"  Error identifying type dependencies in parallel, processing serially: {str(e)}")
+                dependencies = None
+            
+            if dependencies is not None:
+                yield from dependencies
+                return
+        
+        for task in tasks:
+            yield from _connect_elements_by_keywords(*task)
+    
+    def _analyze_conditional_dependencies(self, document_map: Dict, element_texts: Dict[str, str]) -> Iterator[Dict]:
         """
         Analyze dependencies based on conditional language from Phase 3.
         
         Args:
             document_map: Document map with language analysis
+            element_texts: Lowercased element text by element ID
             
-        Returns:
-            List of conditional dependencies
+        Yields:
+            Conditional dependencies
         """
-        dependencies = []
-        
         # Check for elements with language analysis
         elements_with_language = document_map.get('elements_with_language_analysis', [])
         if not elements_with_language:
-            return dependencies
+            return
         
-        # Extract elements by ID for easier lookup
-        elements_by_id = {}
-        for element in document_map.get('elements', []):
-            element_id = element.get('id')
-            if element_id:
-                elements_by_id[element_id] = element
+        # Index element words once so each condition only touches matching elements
+        term_index, element_ids = self._build_term_index(element_texts)
+        
+        # Scores per distinct set of condition terms; boilerplate conditions repeat across elements
+        condition_scores = {}
         
         # Process each element with conditional language
         for element in elements_with_language:
@@ -290,7 +433,7 @@ class DependencyAnalyzer:
                     
                 # Find potential target elements for this condition
                 target_elements = self._find_elements_related_to_condition(
-                    condition_text, elements_by_id, element_id
+                    condition_text, term_index, element_ids, element_id, condition_scores
                 )
                 
                 # Create dependencies for the targets
@@ -306,7 +449,7 @@ class DependencyAnalyzer:
                     base_strength = 0.7 if dependency_type == 'requires' else 0.8
                     strength = base_strength * similarity_score
                     
-                    dependencies.append({
+                    yield {
                         'source_id': element_id,
                         'target_id': target_id,
                         'dependency_type': dependency_type,
@@ -317,72 +460,99 @@ class DependencyAnalyzer:
                             'condition_text': condition_text,
                             'similarity_score': similarity_score
                         }
-                    })
+                    }
+    
+    def _build_term_index(self, element_texts: Dict[str, str]) -> Tuple[Dict[str, List[int]], List[str]]:
+        """
+        Build an inverted index of element words.
+        
+        Args:
+            element_texts: Lowercased element text by element ID
+            
+        Returns:
+            Tuple of (term -> positions of elements containing it, element IDs by position)
+        """
+        term_index = defaultdict(list)
+        element_ids = list(element_texts)
         
-        return dependencies
+        for position, element_text in enumerate(element_texts.values()):
+            for term in set(self._TOKEN_RE.findall(element_text)):
+                term_index[term].append(position)
+        
+        return term_index, element_ids
     
-    def _find_elements_related_to_condition(self, condition_text, elements_by_id, source_id):
+    def _find_elements_related_to_condition(self, condition_text, term_index, element_ids, source_id,
+                                            condition_scores=None):
         """
         Find elements that may be related to a condition.
         
         Args:
             condition_text: Text of the condition
-            elements_by_id: Dictionary of elements by ID
+            term_index: Inverted index of element words from _build_term_index
+            element_ids: Element IDs by index position
             source_id: ID of the source element (to avoid self-references)
+            condition_scores: Optional cache of scored elements per set of condition terms
             
         Returns:
             List of tuples containing (element_id, similarity_score)
         """
-        # Simple keyword matching for demonstration
-        related_elements = []
-        
         # Extract key terms from condition text
-        words = re.findall(r'\b[A-Za-z]{3,}\b', condition_text)
-        key_terms = [w.lower() for w in words if len(w) > 3]
+        key_terms = frozenset(self._TOKEN_RE.findall(condition_text.lower()))
         
         if not key_terms:
             return []
         
-        # Check each element for matching terms
-        for element_id, element in elements_by_id.items():
-            # Skip self-reference
-            if element_id == source_id:
-                continue
-                
-            element_text = element.get('text', '').lower()
-            
-            # Count matching terms
-            match_count = 0
+        top_related = condition_scores.get(key_terms) if condition_scores is not None else None
+        
+        if top_related is None:
+            # Count matching terms per element from the posting lists
+            match_counts = Counter()
             for term in key_terms:
-                if term in element_text:
-                    match_count += 1
+                match_counts.update(term_index.get(term, ()))
             
-            # Calculate similarity score
-            if match_count > 0:
-                similarity = match_count / len(key_terms)
-                
-                # Only include elements with reasonable similarity
-                if similarity >= 0.2:
-                    related_elements.append((element_id, similarity))
-        
-        # Sort by similarity score
-        related_elements.sort(key=lambda x: x[1], reverse=True)
-        
-        # Limit to top 3 results
-        return related_elements[:3]
+            # Only include elements with reasonable similarity
+            related_elements = [
+                (position, match_count / len(key_terms))
+                for position, match_count in match_counts.items()
+                if match_count / len(key_terms) >= 0.2
+            ]
+            
+            # Keep one extra result so the top 3 survive removing the source element,
+            # ordered by similarity score and by document order on ties
+            top_related = heapq.nlargest(4, related_elements, key=lambda x: (x[1], -x[0]))
+            
+            if condition_scores is not None:
+                condition_scores[key_terms] = top_related
+        
+        # Limit to top 3 results, skipping self-reference
+        return [
+            (element_ids[position], similarity)
+            for position, similarity in top_related
+            if element_ids[position] != source_id
+        ][:3]
     
-    def _deduplicate_dependencies(self, dependencies: List[Dict]) -> List[Dict]:
+    def _deduplicate_dependencies(self, dependencies: Iterable[Dict]) -> List[Dict]:
         """
         Remove duplicate dependencies and resolve conflicts.
         
         Args:
-            dependencies: List of all dependencies
+            dependencies: Iterable of all dependencies
             
         Returns:
             Deduplicated dependencies
         """
-        # Group dependencies by source and target
-        dependency_map = {}
+        # Evidence field carried by each dependency origin
+        evidence_fields = {
+            'reference': 'reference_data',
+            'element_type': 'similarity_data',
+            'conditional': 'condition_data'
+        }
+        
+        # Keep the strongest dependency per source-target pair in a single pass;
+        # origins and evidence are only tracked for pairs found more than once
+        strongest = {}
+        origins = {}
+        evidence = {}
         
         for dep in dependencies:
             source_id = dep.get('source_id')
@@ -392,62 +562,44 @@ class DependencyAnalyzer:
                 continue
                 
             key = (source_id, target_id)
+            current = strongest.get(key)
+            
+            if current is None:
+                strongest[key] = dep
+                continue
+            
+            # On the second sighting, start tracking from the first dependency
+            if key not in origins:
+                origins[key] = set()
+                evidence[key] = {}
+                seen = (current, dep)
+            else:
+                seen = (dep,)
             
-            if key not in dependency_map:
-                dependency_map[key] = []
+            for seen_dep in seen:
+                origin = seen_dep.get('origin', '')
+                origins[key].add(origin)
                 
-            dependency_map[key].append(dep)
+                evidence_field = evidence_fields.get(origin)
+                if evidence_field and evidence_field in seen_dep:
+                    evidence[key][evidence_field] = seen_dep[evidence_field]
+            
+            # Earlier dependency wins ties
+            if dep.get('strength', 0) > current.get('strength', 0):
+                strongest[key] = dep
         
-        # Resolve conflicts for each source-target pair
+        # Combine evidence where several origins found the same dependency
         unique_dependencies = []
         
-        for key, deps in dependency_map.items():
-            if len(deps) == 1:
-                # Only one dependency, no conflict
-                unique_dependencies.append(deps[0])
-            else:
-                # Multiple dependencies, resolve conflict
-                resolved = self._resolve_dependency_conflict(deps)
-                unique_dependencies.append(resolved)
+        for key, dep in strongest.items():
+            if len(origins.get(key, ())) > 1:
+                dep = dict(dep)
+                dep['origin'] = '+'.join(sorted(origins[key]))
+                dep['combined_evidence'] = evidence[key]
+            unique_dependencies.append(dep)
         
         return unique_dependencies
     
-    def _resolve_dependency_conflict(self, dependencies: List[Dict]) -> Dict:
-        """
-        Resolve conflicts between multiple dependencies for the same source-target pair.
-        
-        Args:
-            dependencies: List of conflicting dependencies
-            
-        Returns:
-            Resolved dependency
-        """
-        # Sort by strength, highest first
-        sorted_deps = sorted(dependencies, key=lambda d: d.get('strength', 0), reverse=True)
-        
-        # Start with the strongest dependency
-        resolved = dict(sorted_deps[0])
-        
-        # Check for multiple origins and combine evidence
-        origins = set(d.get('origin', '') for d in dependencies)
-        if len(origins) > 1:
-            resolved['origin'] = '+'.join(sorted(origins))
-            
-            # Combine evidence from different sources
-            evidence = {}
-            for d in dependencies:
-                origin = d.get('origin', '')
-                if origin == 'reference' and 'reference_data' in d:
-                    evidence['reference_data'] = d['reference_data']
-                elif origin == 'element_type' and 'similarity_data' in d:
-                    evidence['similarity_data'] = d['similarity_data']
-                elif origin == 'conditional' and 'condition_data' in d:
-                    evidence['condition_data'] = d['condition_data']
-            
-            resolved['combined_evidence'] = evidence
-        
-        return resolved
-    
     def _build_dependency_chains(self, dependencies: List[Dict]) -> List[Dict]:
         """
         Build chains of dependencies to identify indirect relationships.
@@ -458,94 +610,262 @@ class DependencyAnalyzer:
         Returns:
             List of dependency chains
         """
-        # Build a graph of dependencies
-        dependency_graph = {}
+        # Build a graph of dependencies, indexing nodes by integer so traversal state can
+        # live in flat arrays; each edge carries its strength and target index directly
+        node_index = {}
+        adjacency = []
         for dep in dependencies:
             source_id = dep.get('source_id')
             target_id = dep.get('target_id')
             
             if not source_id or not target_id:
                 continue
-                
-            if source_id not in dependency_graph:
-                dependency_graph[source_id] = []
-                
-            dependency_graph[source_id].append({
+            
+            for node_id in (source_id, target_id):
+                if node_id not in node_index:
+                    node_index[node_id] = len(adjacency)
+                    adjacency.append([])
+            
+            strength = dep.get('strength', 0)
+            adjacency[node_index[source_id]].append((strength, node_index[target_id], {
                 'target_id': target_id,
                 'dependency_id': dep.get('dependency_id', ''),
                 'dependency_type': dep.get('dependency_type', ''),
-                'strength': dep.get('strength', 0)
-            })
+                'strength': strength
+            }))
+        
+        # Identify starting nodes that have outgoing but no incoming edges
+        in_degree = [0] * len(adjacency)
+        for edges in adjacency:
+            for _, target, _ in edges:
+                in_degree[target] += 1
+        
+        starting_nodes = [node for node in range(len(adjacency)) if not in_degree[node]]
+        
+        # Most policy graphs are acyclic, where chains can be built in topological order
+        topological_order = self._topological_order(adjacency, in_degree)
+        if topological_order is not None:
+            return self._find_acyclic_chains(topological_order, starting_nodes, adjacency)
         
-        # Find important chains (length > 1 and high cumulative strength)
+        # Otherwise traverse the graph from each starting node, keeping only the top 20 chains
         chains = []
+        sequence = itertools.count()
+        for start_node in starting_nodes:
+            self._find_chains(start_node, adjacency, chains, sequence)
         
-        # Identify starting nodes that have outgoing but no incoming edges
-        starting_nodes = set(dependency_graph.keys())
-        for deps in dependency_graph.values():
-            for dep in deps:
-                if dep['target_id'] in starting_nodes:
-                    starting_nodes.remove(dep['target_id'])
+        # Sort by strength; earlier-found chains first on ties
+        chains.sort(reverse=True)
+        
+        return [chain for _, _, chain in chains]
+    
+    def _topological_order(self, adjacency, in_degree) -> Optional[List[int]]:
+        """
+        Order graph nodes topologically using Kahn's algorithm.
+        
+        Args:
+            adjacency: Outgoing (strength, target index, dependency) edges per node index
+            in_degree: Number of incoming dependencies per node index
+            
+        Returns:
+            Node indices in topological order, or None if the graph has a cycle
+        """
+        remaining = list(in_degree)
+        queue = deque(node for node in range(len(adjacency)) if not remaining[node])
+        order = []
+        
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            
+            for _, target, _ in adjacency[node]:
+                remaining[target] -= 1
+                if not remaining[target]:
+                    queue.append(target)
+        
+        return order if len(order) == len(adjacency) else None
+    
+    def _find_acyclic_chains(self, topological_order, starting_nodes, adjacency, max_chains=20, max_depth=5):
+        """
+        Find the strongest chains of an acyclic dependency graph.
+        
+        Paths from the starting nodes are extended one dependency at a time
+        in topological order, giving the same chains, strengths and tie order
+        as the depth-first traversal in _find_chains. Paths are compared by
+        cumulative strength and by traversal order (starting node, then the
+        position of each dependency among its source's dependencies). A path
+        reaching a node is dropped once max_chains other paths of the same
+        length to that node are at least as strong and come earlier, since
+        every extension of those then outranks the same extension of it.
+        Paths strictly weaker than max_chains chains already found are not
+        extended at all.
+        
+        Args:
+            topological_order: Node indices in topological order
+            starting_nodes: Indices of nodes without incoming dependencies
+            adjacency: Outgoing (strength, target index, dependency) edges per node index
+            max_chains: Maximum number of chains to keep
+            max_depth: Maximum depth of a node whose dependencies are followed
+            
+        Returns:
+            List of the strongest chains, strongest first
+        """
+        # Candidate paths per node and path length, as (traversal order, strength, dependencies)
+        paths_by_node = [defaultdict(list) for _ in range(len(adjacency))]
         
-        # Traverse the graph from each starting node
         for start_node in starting_nodes:
-            self._find_chains(start_node, dependency_graph, [], chains)
+            for position, (dependency_strength, target, dep) in enumerate(adjacency[start_node]):
+                strength = 1.0 * dependency_strength
+                if round(strength, 3) > 0.5:
+                    paths_by_node[target][1].append(((start_node, position), strength, (dep,)))
         
-        # Filter and sort chains
-        significant_chains = [
-            chain for chain in chains
-            if len(chain['path']) > 1 and chain['cumulative_strength'] > 0.5
-        ]
+        candidates = []
         
-        significant_chains.sort(key=lambda c: c['cumulative_strength'], reverse=True)
+        # Strengths of the strongest chains seen so far; extensions strictly weaker
+        # than all max_chains of them cannot be kept
+        top_strengths = []
         
-        return significant_chains[:20]  # Return top 20 chains
+        for node in topological_order:
+            for length, paths in paths_by_node[node].items():
+                paths = self._drop_dominated_paths(paths, max_chains)
+                
+                # Paths with more than one dependency are chains
+                if length > 1:
+                    candidates.extend(paths)
+                
+                # Continue unless the node is too deep
+                if length > max_depth:
+                    continue
+                
+                for position, (dependency_strength, target, dep) in enumerate(adjacency[node]):
+                    extended = paths_by_node[target][length + 1]
+                    for order, strength, path in paths:
+                        cumulative_strength = strength * dependency_strength
+                        rounded_strength = round(cumulative_strength, 3)
+                        
+                        if rounded_strength <= 0.5 or (
+                            len(top_strengths) == max_chains and rounded_strength < top_strengths[0]
+                        ):
+                            continue
+                        
+                        extended.append((order + (position,), cumulative_strength, path + (dep,)))
+                        
+                        if len(top_strengths) < max_chains:
+                            heapq.heappush(top_strengths, rounded_strength)
+                        elif rounded_strength > top_strengths[0]:
+                            heapq.heapreplace(top_strengths, rounded_strength)
+            
+            # Paths through this node are no longer needed
+            paths_by_node[node] = None
+        
+        top_chains = heapq.nsmallest(
+            max_chains, candidates, key=lambda c: (-round(c[1], 3), c[0])
+        )
+        
+        return [
+            {
+                'path': list(path),
+                'start_node': path[0]['target_id'],
+                'end_node': path[-1]['target_id'],
+                'length': len(path),
+                'cumulative_strength': round(strength, 3)
+            }
+            for _, strength, path in top_chains
+        ]
     
-    def _find_chains(self, node, graph, current_path, all_chains, depth=0, visited=None):
+    def _drop_dominated_paths(self, paths, limit):
         """
-        Recursively find chains in the dependency graph.
+        Drop paths outranked by at least limit stronger-or-equal, earlier paths.
         
         Args:
-            node: Current node
-            graph: Dependency graph
-            current_path: Current path
-            all_chains: All chains found so far
-            depth: Current recursion depth
-            visited: Set of visited nodes
-        """
-        # Initialize visited set if not provided
-        if visited is None:
-            visited = set()
-        
-        # Prevent cycles and limit depth
-        if node in visited or depth > 5:
-            return
+            paths: List of (traversal order, strength, dependencies) tuples
+            limit: Number of dominating paths after which a path is dropped
             
-        visited.add(node)
+        Returns:
+            Remaining paths in traversal order
+        """
+        paths.sort(key=lambda p: p[0])
         
-        # Get dependencies for current node
-        dependencies = graph.get(node, [])
+        kept = []
+        kept_strengths = []
+        for path in paths:
+            strength = path[1]
+            if len(kept_strengths) - bisect.bisect_left(kept_strengths, strength) < limit:
+                kept.append(path)
+                bisect.insort(kept_strengths, strength)
         
-        for dep in dependencies:
-            target = dep['target_id']
+        return kept
+    
+    def _find_chains(self, start, adjacency, top_chains, sequence, max_chains=20, max_depth=5):
+        """
+        Find chains in the dependency graph with an iterative depth-first traversal.
+        
+        Nodes already on the current path are not expanded again, which
+        prevents cycles while still recording the chain that closes them.
+        Only chains with more than one dependency and a cumulative strength
+        above 0.5 are kept, in a bounded min-heap of the strongest chains.
+        Since strengths are at most 1.0, cumulative strength never grows
+        along a path, so branches that cannot enter the heap are skipped.
+        
+        Args:
+            start: Index of the starting node
+            adjacency: Outgoing (strength, target index, dependency) edges per node index
+            top_chains: Min-heap of (cumulative strength, -sequence, chain) entries
+            sequence: Shared counter recording the order chains are found in
+            max_chains: Maximum number of chains to keep
+            max_depth: Maximum depth of a node whose dependencies are followed
+        """
+        on_path = bytearray(len(adjacency))
+        on_path[start] = 1
+        
+        # Parallel stacks: node index and edge iterator per level, the dependencies
+        # along the current path and the cumulative strength of each path prefix
+        nodes = [start]
+        edge_iters = [iter(adjacency[start])]
+        path = []
+        strengths = [1.0]
+        
+        while edge_iters:
+            next_edge = next(edge_iters[-1], None)
+            
+            if next_edge is None:
+                # All dependencies of this node explored; backtrack
+                on_path[nodes.pop()] = 0
+                edge_iters.pop()
+                if path:
+                    path.pop()
+                    strengths.pop()
+                continue
             
-            # Add current dependency to path
-            new_path = current_path + [dep]
+            dependency_strength, target, dep = next_edge
             
             # Calculate cumulative strength
-            cumulative_strength = 1.0
-            for p in new_path:
-                cumulative_strength *= p['strength']
+            cumulative_strength = strengths[-1] * dependency_strength
+            rounded_strength = round(cumulative_strength, 3)
+            
+            # No chain through this dependency can be significant or beat the weakest kept chain
+            if rounded_strength <= 0.5 or (
+                len(top_chains) == max_chains and rounded_strength <= top_chains[0][0]
+            ):
+                continue
             
             # Add chain if length > 1
-            if len(new_path) > 1:
-                all_chains.append({
-                    'path': new_path,
-                    'start_node': current_path[0]['target_id'] if current_path else node,
-                    'end_node': target,
-                    'length': len(new_path),
-                    'cumulative_strength': round(cumulative_strength, 3)
+            if path:
+                entry = (rounded_strength, -next(sequence), {
+                    'path': path + [dep],
+                    'start_node': path[0]['target_id'],
+                    'end_node': dep['target_id'],
+                    'length': len(path) + 1,
+                    'cumulative_strength': rounded_strength
                 })
+                if len(top_chains) < max_chains:
+                    heapq.heappush(top_chains, entry)
+                else:
+                    heapq.heapreplace(top_chains, entry)
             
-            # Continue traversal
-            self._find_chains(target, graph, new_path, all_chains, depth + 1, visited.copy())
\ No newline at end of file
+            # Continue traversal unless the target is already on the path or too deep
+            if not on_path[target] and len(path) < max_depth:
+                on_path[target] = 1
+                nodes.append(target)
+                edge_iters.append(iter(adjacency[target]))
+                path.append(dep)
+                strengths.append(cumulative_strength)
@@ -2,7 +2,9 @@
 Document mapper module for creating navigable document maps from classified sections.
 """
 
+import sys
 import uuid
+from collections import defaultdict
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
@@ -77,16 +79,10 @@ class DocumentMapper:
         Returns:
             Hierarchical section structure
         """
-        # First pass: Create a mapping of section IDs to sections
+        # Build parent-child relationships in a single pass; sections listed before
+        # their parent wait in orphans until the parent appears
         section_map = {}
-        for section in classified_sections:
-            section_id = section.get('id')
-            if section_id:
-                section_map[section_id] = section.copy()
-                # Initialize children array
-                section_map[section_id]['children'] = []
-        
-        # Second pass: Build parent-child relationships
+        orphans = defaultdict(list)
         root_sections = []
         
         for section in classified_sections:
@@ -95,13 +91,29 @@ class DocumentMapper:
             
             if not section_id:
                 continue
-                
-            if parent_id and parent_id in section_map:
-                # Add this section as a child of its parent
-                section_map[parent_id]['children'].append(section_map[section_id])
-            elif not parent_id or parent_id not in section_map:
+            
+            section_node = {**section, 'children': orphans.pop(section_id, [])}
+            
+            # Interned IDs let section map lookups compare by identity; the node keeps
+            # the interned strings so later lookups by its IDs share them
+            if isinstance(section_id, str):
+                section_id = section_node['id'] = sys.intern(section_id)
+            if isinstance(parent_id, str):
+                parent_id = section_node['parent_id'] = sys.intern(parent_id)
+            section_map[section_id] = section_node
+            
+            if not parent_id:
                 # This is a root section
-                root_sections.append(section_map[section_id])
+                root_sections.append(section_node)
+            elif parent_id in section_map:
+                # Add this section as a child of its parent
+                section_map[parent_id]['children'].append(section_node)
+            else:
+                orphans[parent_id].append(section_node)
+        
+        # Sections whose parent never appears are root sections
+        for sections in orphans.values():
+            root_sections.extend(sections)
         
         # Sort root sections by their level and position
         root_sections.sort(key=lambda s: (s.get('level', 999), s.get('id', '')))
@@ -119,15 +131,12 @@ class DocumentMapper:
             Navigation indices
         """
         # Create type-based navigation
-        nav_by_type = {}
+        nav_by_type = defaultdict(list)
         
         for section in classified_sections:
             classification = section.get('classification', {})
             section_type = classification.get('classification', 'OTHER')
             
-            if section_type not in nav_by_type:
-                nav_by_type[section_type] = []
-                
             nav_by_type[section_type].append({
                 'id': section.get('id', ''),
                 'title': section.get('title', ''),
@@ -145,7 +154,7 @@ class DocumentMapper:
                 cross_refs[section_id] = refs
         
         return {
-            'by_type': nav_by_type,
+            'by_type': dict(nav_by_type),
             'cross_references': cross_refs
         }
     
@@ -159,18 +168,15 @@ class DocumentMapper:
         Returns:
             Section counts by type
         """
-        counts = {}
+        counts = defaultdict(int)
         
         for section in classified_sections:
             classification = section.get('classification', {})
             section_type = classification.get('classification', 'OTHER')
             
-            if section_type not in counts:
-                counts[section_type] = 0
-                
             counts[section_type] += 1
             
         # Add total count
         counts['TOTAL'] = len(classified_sections)
         
-        return counts
\ No newline at end of file
+        return dict(counts)
\ No newline at end of file
@@ -4,10 +4,64 @@ Document parser module for extracting text from insurance policy documents.
 
 import os
 import io
-from typing import Dict, List, Optional
+import mmap
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from operator import attrgetter
+from typing import Dict, Iterator, List, Optional, Tuple
 import PyPDF2
 from docx import Document
 from config.config import ParserConfig
+from src.result_cache import ResultCache
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# Bump when parser output changes so stale cache entries are ignored
+PARSER_VERSION = 1
+
+def _extract_pdf_page_range(pdf_path: str, backend: str, start: int, stop: int) -> List[str]:
+    """
+    Extract the text of a range of PDF pages.
+    
+    Kept at module level so it can be run in worker processes; each call
+    opens its own copy of the document.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        backend: PDF backend to use ("pypdfium2" or "pypdf2")
+        start: Index of the first page to extract
+        stop: Index after the last page to extract
+        
+    Returns:
+        List of page texts
+    """
+    page_texts = []
+    
+    if backend == 'pypdfium2':
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            for page_index in range(start, stop):
+                page = pdf[page_index]
+                text_page = page.get_textpage()
+                
+                # PDFium separates lines with CRLF; normalize so paragraph breaks match other formats
+                page_texts.append(text_page.get_text_range().replace('\r\n', '\n'))
+                
+                text_page.close()
+                page.close()
+        finally:
+            pdf.close()
+    else:
+        # Read through a memory map so PyPDF2's many seeks and small reads avoid file I/O calls
+        with open(pdf_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            reader = PyPDF2.PdfReader(mapped)
+            for page_index in range(start, stop):
+                page_texts.append(reader.pages[page_index].extract_text())
+    
+    return page_texts
 
 class DocumentParser:
     """Handles document file parsing and text extraction."""
@@ -20,6 +74,11 @@ class DocumentParser:
             config: Configuration for the parser
         """
         self.config = config or ParserConfig()
+        self.cache = ResultCache(self.config.cache_dir) if self.config.cache_dir else None
+        
+        # Page count from which PyPDF2 pages are extracted in worker processes; below it, starting
+        # the workers costs more than the extraction (about 5 ms per page serially)
+        self.parallel_page_threshold = 32
     
     def parse_document(self, document_path: str) -> Dict:
         """
@@ -41,11 +100,71 @@ class DocumentParser:
         file_extension = document_path.split('.')[-1].lower()
         
         if file_extension == 'pdf':
-            return self._parse_pdf(document_path)
+            parse = self._parse_pdf
         elif file_extension in ['docx', 'doc']:
-            return self._parse_docx(document_path)
+            parse = self._parse_docx
         else:
             raise ValueError(f"Unsupported file type: {file_extension}")
+        
+        cache_key = self._get_cache_key(document_path) if self.cache else None
+        
+        if cache_key:
+            document_info = self.cache.get(cache_key)
+            if document_info is not None:
+                # Identical content may have been cached under a different path
+                document_info['file_path'] = document_path
+                return document_info
+        
+        document_info = parse(document_path)
+        
+        if cache_key:
+            self.cache.set(cache_key, document_info)
+        
+        return document_info
+    
+    def _get_cache_key(self, document_path: str) -> str:
+        """
+        Get the cache key for a document.
+        
+        The key combines a hash of the file contents with the parser version
+        and every setting that affects the parsed output.
+        
+        Args:
+            document_path: Path to the document file
+            
+        Returns:
+            Cache key for the document
+        """
+        file_hash = hashlib.blake2b(digest_size=16)
+        
+        with open(document_path, 'rb') as file:
+            # Hash through a memory map to avoid reading the whole file into memory
+            if os.fstat(file.fileno()).st_size > 0:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    file_hash.update(mapped)
+        
+        settings = (
+            PARSER_VERSION,
+            self.config.chunk_size,
+            self.config.overlap,
+            self.config.preserve_tables,
+            self._get_pdf_backend(),
+        )
+        return ResultCache.make_key(file_hash.hexdigest(), repr(settings))
+    
+    def _get_pdf_backend(self) -> str:
+        """
+        Get the PDF backend that will actually be used.
+        
+        PDFium extracts text natively; PyPDF2 remains available as a fallback
+        when pypdfium2 is not installed.
+        
+        Returns:
+            "pypdfium2" or "pypdf2"
+        """
+        if self.config.pdf_backend == 'pypdfium2' and pdfium is not None:
+            return 'pypdfium2'
+        return 'pypdf2'
     
     def _parse_pdf(self, pdf_path: str) -> Dict:
         """
@@ -66,40 +185,131 @@ class DocumentParser:
         }
         
         try:
-            with open(pdf_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                
-                # Extract metadata
-                if reader.metadata:
-                    document_info['metadata'] = {
-                        'title': reader.metadata.get('/Title', ''),
-                        'author': reader.metadata.get('/Author', ''),
-                        'subject': reader.metadata.get('/Subject', ''),
-                        'creator': reader.metadata.get('/Creator', ''),
-                        'producer': reader.metadata.get('/Producer', ''),
-                        'creation_date': reader.metadata.get('/CreationDate', '')
-                    }
-                
-                # Extract text from all pages
-                for i, page in enumerate(reader.pages):
-                    page_text = page.extract_text()
-                    
-                    page_info = {
-                        'page_number': i + 1,
-                        'text': page_text
-                    }
-                    
-                    document_info['pages'].append(page_info)
-                    document_info['full_text'] += page_text + "\n\n"
-                
-                # Create text chunks for LLM processing
-                document_info['chunks'] = self._create_chunks(document_info['full_text'])
-                
-                return document_info
+            backend = self._get_pdf_backend()
+            if backend == 'pypdfium2':
+                metadata, page_count = self._read_pdf_info_pdfium(pdf_path)
+            else:
+                metadata, page_count = self._read_pdf_info_pypdf2(pdf_path)
+            
+            page_texts = self._extract_pdf_pages(pdf_path, backend, page_count)
+            
+            if metadata:
+                document_info['metadata'] = metadata
+            
+            # Collect page texts, joining the full text once (each page followed by a paragraph break)
+            document_info['pages'] = [
+                {
+                    'page_number': i + 1,
+                    'text': page_text
+                }
+                for i, page_text in enumerate(page_texts)
+            ]
+            document_info['full_text'] = "".join(page_text + "\n\n" for page_text in page_texts)
+            
+            # Create text chunks for LLM processing
+            document_info['chunks'] = self._create_chunks(document_info['full_text'])
+            
+            return document_info
                 
         except Exception as e:
             raise RuntimeError(f"Error parsing PDF: {str(e)}")
     
+    def _read_pdf_info_pypdf2(self, pdf_path: str) -> Tuple[Dict, int]:
+        """
+        Read metadata and page count of a PDF with PyPDF2.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            
+        Returns:
+            Tuple of (metadata, page count)
+        """
+        metadata = {}
+        
+        with open(pdf_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            reader = PyPDF2.PdfReader(mapped)
+            
+            # Extract metadata
+            if reader.metadata:
+                metadata = {
+                    'title': reader.metadata.get('/Title', ''),
+                    'author': reader.metadata.get('/Author', ''),
+                    'subject': reader.metadata.get('/Subject', ''),
+                    'creator': reader.metadata.get('/Creator', ''),
+                    'producer': reader.metadata.get('/Producer', ''),
+                    'creation_date': reader.metadata.get('/CreationDate', '')
+                }
+            
+            page_count = len(reader.pages)
+        
+        return metadata, page_count
+    
+    def _read_pdf_info_pdfium(self, pdf_path: str) -> Tuple[Dict, int]:
+        """
+        Read metadata and page count of a PDF with PDFium.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            
+        Returns:
+            Tuple of (metadata, page count)
+        """
+        metadata = {}
+        
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            # Extract metadata
+            pdf_metadata = pdf.get_metadata_dict()
+            if any(pdf_metadata.values()):
+                metadata = {
+                    'title': pdf_metadata.get('Title', ''),
+                    'author': pdf_metadata.get('Author', ''),
+                    'subject': pdf_metadata.get('Subject', ''),
+                    'creator': pdf_metadata.get('Creator', ''),
+                    'producer': pdf_metadata.get('Producer', ''),
+                    'creation_date': pdf_metadata.get('CreationDate', '')
+                }
+            
+            page_count = len(pdf)
+        finally:
+            pdf.close()
+        
+        return metadata, page_count
+    
+    def _extract_pdf_pages(self, pdf_path: str, backend: str, page_count: int) -> List[str]:
+        """
+        Extract the text of all PDF pages, in worker processes for longer PyPDF2 documents.
+        
+        PDFium extracts pages natively in about 2 ms each, so it always runs serially.
+        Otherwise pages are split into one contiguous range per worker; results keep page order.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            backend: PDF backend to use ("pypdfium2" or "pypdf2")
+            page_count: Number of pages in the document
+            
+        Returns:
+            List of page texts
+        """
+        max_workers = min(os.cpu_count() or 1, page_count)
+        if backend == 'pypdfium2' or page_count < self.parallel_page_threshold or max_workers < 2:
+            return _extract_pdf_page_range(pdf_path, backend, 0, page_count)
+        
+        bounds = [page_count * worker // max_workers for worker in range(max_workers + 1)]
+        
+        try:
+            page_texts = []
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                for partial in executor.map(
+                    _extract_pdf_page_range,
+                    [pdf_path] * max_workers, [backend] * max_workers, bounds[:-1], bounds[1:]
+                ):
+                    page_texts.extend(partial)
+            return page_texts
+        except Exception as e:
+            print(f"  Error extracting PDF pages in parallel, extracting serially: {str(e)}")
+            return _extract_pdf_page_range(pdf_path, backend, 0, page_count)
+    
     def _parse_docx(self, docx_path: str) -> Dict:
         """
         Extract text and structure from DOCX documents.
@@ -132,25 +342,22 @@ class DocumentParser:
             }
             
             # Extract text from paragraphs
-            all_text = []
-            for paragraph in doc.paragraphs:
-                all_text.append(paragraph.text)
+            all_text = [paragraph.text for paragraph in doc.paragraphs]
             
-            document_info['full_text'] = "\n".join(all_text)
+            full_text = "\n".join(all_text)
             
             # Extract tables if configured
             if self.config.preserve_tables:
-                tables_text = []
-                for i, table in enumerate(doc.tables):
-                    table_rows = []
-                    for row in table.rows:
-                        row_cells = [cell.text for cell in row.cells]
-                        table_rows.append(" | ".join(row_cells))
-                    
-                    tables_text.append(f"[TABLE {i+1}]:\n" + "\n".join(table_rows))
+                get_text = attrgetter('text')
+                tables_text = [
+                    f"[TABLE {i+1}]:\n" + "\n".join([" | ".join(map(get_text, row.cells)) for row in table.rows])
+                    for i, table in enumerate(doc.tables)
+                ]
                 
                 document_info['tables'] = tables_text
-                document_info['full_text'] += "\n\n" + "\n\n".join(tables_text)
+                full_text = full_text + "\n\n" + "\n\n".join(tables_text)
+            
+            document_info['full_text'] = full_text
             
             # Create text chunks for LLM processing
             document_info['chunks'] = self._create_chunks(document_info['full_text'])
@@ -170,41 +377,58 @@ class DocumentParser:
         Returns:
             List of text chunks
         """
+        # Parsed documents are cached as JSON and report chunk progress, so keep a list here
+        return list(self._iter_chunks(text))
+    
+    def _iter_chunks(self, text: str) -> Iterator[str]:
+        """
+        Lazily split text into chunks for LLM processing.
+        
+        Args:
+            text: Full document text
+            
+        Yields:
+            Text chunks in document order
+        """
         chunk_size = self.config.chunk_size
         overlap = self.config.overlap
         
         if len(text) <= chunk_size:
-            return [text]
+            yield text
+            return
         
-        chunks = []
         start = 0
         
         while start < len(text):
             # Get chunk of text
             end = start + chunk_size
             if end >= len(text):
-                chunk = text[start:]
+                end = len(text)
             else:
                 # Find a good breaking point (prefer paragraph breaks)
-                # Look for newlines in the overlap region
+                # Look for newlines in the overlap region, searching the text in place
                 search_region_start = max(end - overlap, start)
-                search_region = text[search_region_start:end]
                 
                 # Try to find double newline (paragraph break)
-                break_pos = search_region.rfind('\n\n')
+                break_pos = text.rfind('\n\n', search_region_start, end)
                 if break_pos == -1:
                     # If no paragraph break, try a single newline
-                    break_pos = search_region.rfind('\n')
+                    break_pos = text.rfind('\n', search_region_start, end)
                 
                 if break_pos != -1:
                     # Found a good breaking point
-                    end = search_region_start + break_pos + 1
+                    end = break_pos + 1
                 # Else, just break at the chunk size
             
-            chunk = text[start:end].strip()
-            chunks.append(chunk)
+            # Trim surrounding whitespace by moving the bounds so each chunk is copied only once
+            chunk_start = start
+            chunk_end = end
+            while chunk_start < chunk_end and text[chunk_start].isspace():
+                chunk_start += 1
+            while chunk_end > chunk_start and text[chunk_end - 1].isspace():
+                chunk_end -= 1
+            
+            yield text[chunk_start:chunk_end]
             
             # Move start position, accounting for overlap
-            start = end
-        
-        return chunks
\ No newline at end of file
+            start = end
\ No newline at end of file
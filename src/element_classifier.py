@@ -2,8 +2,11 @@
 Element classifier module for categorizing policy elements by type and function.
 """
 
+import re
 import json
 from typing import Dict, List, Optional, Any
+from src.result_cache import ResultCache
+from src.llm_response import call_concurrently, fill_prompt_template, parse_json_response, split_prompt_template
 
 class ElementClassifier:
     """Classifies and validates policy elements."""
@@ -23,15 +26,49 @@ class ElementClassifier:
         "OTHER"                # Other element types
     ]
     
-    def __init__(self, llm_client):
+    # Set view of the element types for validating LLM responses
+    _ELEMENT_TYPES_SET = frozenset(ELEMENT_TYPES)
+    
+    # Text cues that mark an element as simple enough to skip refined classification.
+    # An element qualifies when its text contains a phrase from each group.
+    SIMPLE_ELEMENT_CUES = {
+        "DEFINITION": (('"',), (" means ",)),
+        "EXCLUSION": (("not cover", "does not", "excluded", "except", "exclusion"),),
+        "COVERAGE_GRANT": (("we will pay", "we cover", "this policy covers"),),
+        "CONDITION": (("condition", "must be", "required to", "you must", "insured shall"),),
+        "SUB_LIMIT": (("limit of", "$", "maximum of", "up to"), ("per", "for", "each")),
+    }
+    
+    # Fixed function descriptions for simple elements, by element type
+    FUNCTION_DESCRIPTIONS = {
+        "COVERAGE_GRANT": "Provides coverage for specified losses or events",
+        "EXCLUSION": "Explicitly removes something from coverage",
+        "CONDITION": "Establishes requirements for coverage to apply",
+        "SUB_LIMIT": "Specifies a limit within a broader coverage",
+        "RETENTION": "Indicates a deductible or self-insured amount",
+    }
+    
+    # Common important terms reported as keywords when present
+    IMPORTANT_TERMS = ("bodily injury", "property damage", "liability", "loss", "damage",
+                       "claim", "notice", "insured", "coverage", "policy", "limit",
+                       "deductible", "retention", "occurrence", "accident")
+    
+    _QUOTED_TERM_RE = re.compile(r'"([^"]*)"')
+    
+    def __init__(self, llm_client, cache_dir: Optional[str] = None, max_concurrent_requests: int = 8):
         """
         Initialize the element classifier.
         
         Args:
             llm_client: Client for the LLM
+            cache_dir: Directory for cached classifications (None disables caching)
+            max_concurrent_requests: Maximum number of classification requests in flight at once
         """
         self.llm_client = llm_client
         self.prompts = self._load_prompts()
+        self.prompt_templates = {name: split_prompt_template(template) for name, template in self.prompts.items()}
+        self.cache = ResultCache(cache_dir) if cache_dir else None
+        self.max_concurrent_requests = max_concurrent_requests
         
     def _load_prompts(self):
         """Load prompt templates for element classification."""
@@ -99,79 +136,97 @@ class ElementClassifier:
         Returns:
             List of classified elements
         """
-        classified_elements = []
+        section_type = section.get('classification', {}).get('classification', 'UNKNOWN')
+        complex_elements = []
         
         for element in elements:
             try:
                 # Get initial classification from extraction
                 initial_type = element.get('type', 'UNKNOWN')
                 
+                # Lowercase and scan the text once for all the simple-element checks below
+                element_text = element.get('text', '')
+                text_lower = element_text.lower()
+                
                 # Skip classification refinement for high-confidence simple elements
-                if self._is_simple_element(element, initial_type):
+                if self._is_simple_element(element, initial_type, text_lower):
+                    quoted_terms = self._QUOTED_TERM_RE.findall(element_text)
+                    
                     # Add default classification metadata
                     element['confidence'] = 0.9
                     element['explanation'] = f"Clear {initial_type.lower()} based on content and structure"
-                    element['keywords'] = self._extract_keywords(element.get('text', ''))
-                    element['function'] = self._generate_function_description(element, initial_type)
-                    classified_elements.append(element)
+                    element['keywords'] = self._extract_keywords(element_text, text_lower, quoted_terms)
+                    element['function'] = self._generate_function_description(element, initial_type, quoted_terms)
                     continue
                 
-                # For complex elements, use LLM for refined classification
-                classification = self._classify_element(
-                    element.get('text', ''),
-                    initial_type,
-                    section.get('classification', {}).get('classification', 'UNKNOWN')
-                )
-                
-                # Update element with refined classification
-                element.update(classification)
-                classified_elements.append(element)
+                complex_elements.append((element, initial_type))
                 
             except Exception as e:
-                print(f"Error classifying element: {str(e)}")
-                # Keep the element with original classification
-                element['confidence'] = 0.5
-                element['explanation'] = f"Classification error: {str(e)}"
-                element['keywords'] = []
-                element['function'] = "Unknown function"
-                classified_elements.append(element)
+                self._set_fallback_classification(element, e)
         
-        return classified_elements
+        # For complex elements, use LLM for refined classification
+        outcomes = call_concurrently(
+            self._classify_element,
+            [(element.get('text', ''), initial_type, section_type) for element, initial_type in complex_elements],
+            self.max_concurrent_requests
+        )
+        
+        for (element, _), (classification, error) in zip(complex_elements, outcomes):
+            if error is not None:
+                self._set_fallback_classification(element, error)
+                continue
+            
+            # Update element with refined classification
+            element.update(classification)
+        
+        return list(elements)
     
-    def _is_simple_element(self, element: Dict, element_type: str) -> bool:
+    def _set_fallback_classification(self, element: Dict, error: Exception) -> None:
+        """
+        Keep an element's original classification after a classification error.
+        
+        Args:
+            element: The element that failed classification
+            error: The error raised while classifying it
+        """
+        print(f"Error classifying element: {str(error)}")
+        element['confidence'] = 0.5
+        element['explanation'] = f"Classification error: {str(error)}"
+        element['keywords'] = []
+        element['function'] = "Unknown function"
+    
+    def _is_simple_element(self, element: Dict, element_type: str, text_lower: Optional[str] = None) -> bool:
         """
         Determine if an element is simple enough to skip refined classification.
         
         Args:
             element: The element to check
             element_type: The initial element type
+            text_lower: Lowercased element text, if already computed
             
         Returns:
             Boolean indicating if this is a simple element
         """
-        element_text = element.get('text', '').lower()
+        cue_groups = self.SIMPLE_ELEMENT_CUES.get(element_type)
+        if cue_groups is None:
+            # By default, get refined classification
+            return False
         
-        # Simple checks based on element type and text patterns
-        if element_type == "DEFINITION" and '"' in element_text and " means " in element_text:
-            return True
-        elif element_type == "EXCLUSION" and any(x in element_text for x in ["not cover", "does not", "excluded", "except", "exclusion"]):
-            return True
-        elif element_type == "COVERAGE_GRANT" and any(x in element_text for x in ["we will pay", "we cover", "this policy covers"]):
-            return True
-        elif element_type == "CONDITION" and any(x in element_text for x in ["condition", "must be", "required to", "you must", "insured shall"]):
-            return True
-        elif element_type == "SUB_LIMIT" and any(x in element_text for x in ["limit of", "$", "maximum of", "up to"]) and any(y in element_text for y in ["per", "for", "each"]):
-            return True
+        if text_lower is None:
+            text_lower = element.get('text', '').lower()
         
-        # By default, get refined classification
-        return False
+        # Simple when the text contains at least one phrase from every cue group
+        return all(any(phrase in text_lower for phrase in group) for group in cue_groups)
     
-    def _extract_keywords(self, text: str) -> List[str]:
+    def _extract_keywords(self, text: str, text_lower: Optional[str] = None,
+                          quoted_terms: Optional[List[str]] = None) -> List[str]:
         """
         Extract important keywords from element text.
         
         Args:
             text: Element text
+            text_lower: Lowercased element text, if already computed
+            quoted_terms: Quoted terms in the element text, if already found
             
         Returns:
             List of keywords
@@ -180,56 +235,45 @@ class ElementClassifier:
         keywords = []
         
         # Look for quoted terms (common in policies)
-        import re
-        quoted_terms = re.findall(r'"([^"]*)"', text)
+        if quoted_terms is None:
+            quoted_terms = self._QUOTED_TERM_RE.findall(text)
         keywords.extend(quoted_terms)
         
         # Add common important terms if present
-        important_terms = ["bodily injury", "property damage", "liability", "loss", "damage", 
-                          "claim", "notice", "insured", "coverage", "policy", "limit", 
-                          "deductible", "retention", "occurrence", "accident"]
-        
-        for term in important_terms:
-            if term in text.lower():
-                keywords.append(term)
+        if text_lower is None:
+            text_lower = text.lower()
+        keywords.extend(term for term in self.IMPORTANT_TERMS if term in text_lower)
         
         # Remove duplicates and limit length
         return list(set(keywords))[:5]
     
-    def _generate_function_description(self, element: Dict, element_type: str) -> str:
+    def _generate_function_description(self, element: Dict, element_type: str,
+                                       quoted_terms: Optional[List[str]] = None) -> str:
         """
         Generate a simple function description for an element.
         
         Args:
             element: The element
             element_type: Element type
+            quoted_terms: Quoted terms in the element text, if already found
             
         Returns:
             Function description
         """
-        text = element.get('text', '').lower()
+        # Definitions name the term being defined when it is quoted
+        if element_type == "DEFINITION":
+            if quoted_terms is None:
+                quoted_terms = self._QUOTED_TERM_RE.findall(element.get('text', ''))
+            if quoted_terms:
+                return f"Defines the term '{quoted_terms[0].lower()}'"
+            return "Defines a term used in the policy"
         
         # Generate descriptions based on element type
-        if element_type == "COVERAGE_GRANT":
-            return "Provides coverage for specified losses or events"
-        elif element_type == "EXCLUSION":
-            return "Explicitly removes something from coverage"
-        elif element_type == "CONDITION":
-            return "Establishes requirements for coverage to apply"
-        elif element_type == "DEFINITION":
-            # Try to extract the term being defined
-            import re
-            term_match = re.search(r'"([^"]*)"', text)
-            if term_match:
-                return f"Defines the term '{term_match.group(1)}'"
-            else:
-                return "Defines a term used in the policy"
-        elif element_type == "SUB_LIMIT":
-            return "Specifies a limit within a broader coverage"
-        elif element_type == "RETENTION":
-            return "Indicates a deductible or self-insured amount"
-        else:
-            return f"Functions as a {element_type.lower().replace('_', ' ')}"
+        description = self.FUNCTION_DESCRIPTIONS.get(element_type)
+        if description is not None:
+            return description
+        
+        return f"Functions as a {element_type.lower().replace('_', ' ')}"
     
     def _classify_element(self, element_text: str, initial_type: str, section_type: str) -> Dict:
         """
@@ -244,26 +288,37 @@ class ElementClassifier:
             Refined classification information
         """
         # Prepare prompt for classification
-        prompt = self.prompts["classification"].format(
+        prompt = fill_prompt_template(
+            self.prompt_templates["classification"],
             element_text=element_text,
             initial_type=initial_type,
             section_type=section_type
         )
         
+        # The prompt embeds the element text, both types and the template, so it identifies the result
+        cache_key = ResultCache.make_key(prompt) if self.cache else None
+        if cache_key:
+            classification = self.cache.get(cache_key)
+            if classification is not None:
+                return classification
+        
         # Call LLM for classification
         response = self.llm_client.generate(prompt)
         
         # Parse classification response
         try:
-            cleaned_response = self._clean_json_response(response)
-            classification = json.loads(cleaned_response)
+            classification = parse_json_response(response)
             
             # Validate the classification type
-            if classification.get('type') not in self.ELEMENT_TYPES:
+            element_type = classification.get('type')
+            if not isinstance(element_type, str) or element_type not in self._ELEMENT_TYPES_SET:
                 # Default to initial type if invalid
                 classification['type'] = initial_type
                 classification['explanation'] = classification.get('explanation', '') + " (Corrected invalid type)"
             
+            if cache_key:
+                self.cache.set(cache_key, classification)
+            
             return classification
         except json.JSONDecodeError:
             # If parsing fails, return basic classification
@@ -274,24 +329,4 @@ class ElementClassifier:
                 "explanation": "Failed to get refined classification",
                 "keywords": self._extract_keywords(element_text),
                 "function": self._generate_function_description({}, initial_type)
-            }
-    
-    def _clean_json_response(self, response: str) -> str:
-        """
-        Clean LLM response to extract valid JSON.
-        
-        Args:
-            response: Raw LLM response
-            
-        Returns:
-            Cleaned JSON string
-        """
-        response = response.strip()
-        
-        # Remove markdown code blocks if present
-        if response.startswith('```json') and response.endswith('```'):
-            response = response[7:-3].strip()
-        elif response.startswith('```') and response.endswith('```'):
-            response = response[3:-3].strip()
-            
-        return response
\ No newline at end of file
+            }
\ No newline at end of file
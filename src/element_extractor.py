@@ -5,19 +5,24 @@ Element extractor module for identifying policy elements from document sections.
 import json
 import uuid
 from typing import Dict, List, Optional, Any
+from src.result_cache import ResultCache
+from src.llm_response import fill_prompt_template, parse_json_response, split_prompt_template
 
 class ElementExtractor:
     """Extracts policy elements from section text."""
     
-    def __init__(self, llm_client):
+    def __init__(self, llm_client, cache_dir: Optional[str] = None):
         """
         Initialize the element extractor.
         
         Args:
             llm_client: Client for the LLM
+            cache_dir: Directory for cached extraction results (None disables caching)
         """
         self.llm_client = llm_client
         self.prompts = self._load_prompts()
+        self.prompt_templates = {name: split_prompt_template(template) for name, template in self.prompts.items()}
+        self.cache = ResultCache(cache_dir) if cache_dir else None
     
     def _load_prompts(self):
         """Load prompt templates for element extraction."""
@@ -97,51 +102,41 @@ class ElementExtractor:
         section_text = section.get('text', '')
         section_type = section.get('classification', {}).get('classification', 'UNKNOWN')
         
-        prompt = self.prompts["extraction"].format(
+        prompt = fill_prompt_template(
+            self.prompt_templates["extraction"],
             section_text=section_text,
             section_type=section_type
         )
         
-        # Call LLM with the prompt
-        response = self.llm_client.generate(prompt)
+        # Reuse the parsed response for section text seen in earlier runs
+        cache_key = ResultCache.make_key(prompt) if self.cache else None
+        elements = self.cache.get(cache_key) if cache_key else None
         
-        # Parse response to get elements
-        try:
-            # Clean up the response (remove code blocks if present)
-            cleaned_response = self._clean_json_response(response)
-            elements = json.loads(cleaned_response)
+        if elements is None:
+            # Call LLM with the prompt
+            response = self.llm_client.generate(prompt)
             
-            # Add section ID and generate unique IDs for elements
-            for i, element in enumerate(elements):
-                element['id'] = f"element_{section.get('id')}_{i}_{str(uuid.uuid4())[:8]}"
-                element['section_id'] = section.get('id')
-                
-                # Initialize relationship fields
-                element['parent_element_id'] = None
-                element['child_element_ids'] = []
+            # Parse response to get elements
+            try:
+                # Clean up the response (remove code blocks if present)
+                elements = parse_json_response(response)
+            except json.JSONDecodeError as e:
+                print(f"Error parsing element extraction response: {str(e)}")
+                print(f"Raw response: {response[:200]}...")
+                return []
             
-            return elements
-        except json.JSONDecodeError as e:
-            print(f"Error parsing element extraction response: {str(e)}")
-            print(f"Raw response: {response[:200]}...")
-            return []
-    
-    def _clean_json_response(self, response: str) -> str:
-        """
-        Clean LLM response to extract valid JSON.
+            if cache_key and isinstance(elements, list) and all(isinstance(element, dict) for element in elements):
+                self.cache.set(cache_key, elements)
         
-        Args:
-            response: Raw LLM response
+        # Add section ID and generate unique IDs for elements; the index keeps IDs distinct
+        # within this call, so one random token per call is enough to separate repeated extractions
+        id_token = str(uuid.uuid4())[:8]
+        for i, element in enumerate(elements):
+            element['id'] = f"element_{section.get('id')}_{i}_{id_token}"
+            element['section_id'] = section.get('id')
             
-        Returns:
-            Cleaned JSON string
-        """
-        response = response.strip()
+            # Initialize relationship fields
+            element['parent_element_id'] = None
+            element['child_element_ids'] = []
         
-        # Remove markdown code blocks if present
-        if response.startswith('```json') and response.endswith('```'):
-            response = response[7:-3].strip()
-        elif response.startswith('```') and response.endswith('```'):
-            response = response[3:-3].strip()
-            
-        return response
\ No newline at end of file
+        return elements
\ No newline at end of file
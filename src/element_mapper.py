@@ -2,11 +2,56 @@
 Element mapper module for creating structured representations of policy elements.
 """
 
+import re
+from collections import Counter, defaultdict
+from types import MappingProxyType
 from typing import Dict, List, Optional, Any
 
+def index_elements_by_id(elements: List[Dict]) -> Dict[str, Dict]:
+    """
+    Index elements by their ID so later phases can share one lookup table.
+    
+    Args:
+        elements: List of elements
+        
+    Returns:
+        Dictionary of elements by ID, skipping elements without an ID
+    """
+    elements_by_id = {}
+    for element in elements:
+        element_id = element.get('id')
+        if element_id:
+            elements_by_id[element_id] = element
+    
+    return elements_by_id
+
+def _truncate(text: str, max_length: int) -> str:
+    """
+    Shorten text for display, marking truncation with an ellipsis.
+    
+    Args:
+        text: Text to shorten
+        max_length: Maximum number of characters to keep
+        
+    Returns:
+        The text itself if short enough, otherwise its prefix followed by '...'
+    """
+    return text if len(text) <= max_length else text[:max_length] + '...'
+
 class ElementMapper:
     """Maps elements into a structured policy representation."""
     
+    _QUOTED_TERM_RE = re.compile(r'"([^"]*)"')
+    
+    # Relationship lists copied into the relationship graph when an element has them
+    _OPTIONAL_RELATIONSHIPS = ('references', 'dependencies', 'modifies', 'modified_by')
+    
+    # Element types that feed a type-based policy insight
+    _INSIGHT_ELEMENT_TYPES = frozenset({'COVERAGE_GRANT', 'EXCLUSION', 'DEFINITION', 'REPORTING_OBLIGATION', 'CONDITION'})
+    
+    # Shared read-only stand-in for elements without metadata, instead of a new dict per element
+    _NO_METADATA = MappingProxyType({})
+    
     def create_element_map(self, all_elements: List[Dict], document_map: Dict) -> Dict:
         """
         Create a structured map of policy elements.
@@ -16,326 +61,209 @@ class ElementMapper:
             document_map: The document map from previous processing
             
         Returns:
-            Enhanced document map with element information
+            The document map, enhanced in place with element information
         """
-        # Group elements by section
-        elements_by_section = {}
-        for element in all_elements:
-            section_id = element.get('section_id')
-            if section_id:
-                if section_id not in elements_by_section:
-                    elements_by_section[section_id] = []
-                elements_by_section[section_id].append(element)
+        # Collect every per-element index and summary in one pass over the elements;
+        # flat documents have no sections to receive the per-section groups
+        element_indices = self._collect_element_indices(
+            all_elements, group_by_section=bool(document_map.get('sections'))
+        )
         
-        # Add elements to document map
-        enhanced_map = document_map.copy()
+        # Add elements to document map; its sections are enhanced in place, so the map is too
+        enhanced_map = document_map
         
         # Add all elements to the map
         enhanced_map['elements'] = all_elements
         
         # Add element counts by type
-        element_counts = self._count_elements_by_type(all_elements)
-        enhanced_map['element_counts'] = element_counts
+        enhanced_map['element_counts'] = element_indices['counts']
         
         # Add element navigation
-        element_navigation = self._create_element_navigation(all_elements)
-        enhanced_map['element_navigation'] = element_navigation
+        enhanced_map['element_navigation'] = element_indices['navigation']
         
         # Add elements to their respective sections
-        self._add_elements_to_sections(enhanced_map, elements_by_section)
+        self._add_elements_to_sections(enhanced_map, element_indices['by_section'])
         
         # Add policy insights
-        enhanced_map['policy_insights'] = self._generate_policy_insights(all_elements, document_map)
+        enhanced_map['policy_insights'] = element_indices['insights']
         
         return enhanced_map
     
-    def _count_elements_by_type(self, elements: List[Dict]) -> Dict:
+    def _collect_element_indices(self, elements: List[Dict], group_by_section: bool = True) -> Dict:
         """
-        Count elements by type.
+        Build section groups, type counts, navigation indices and policy insights in a single pass.
         
         Args:
-            elements: List of elements
+            elements: List of all elements
+            group_by_section: Whether to group the elements by section ID
             
         Returns:
-            Dictionary of counts by element type
+            Dictionary with 'by_section', 'counts', 'navigation' and 'insights' entries
         """
-        counts = {}
+        elements_by_section = defaultdict(list)
+        counts = Counter()
+        nav_by_type = defaultdict(list)
+        relationship_graph = {}
+        keyword_index = defaultdict(list)
+        # Keywords repeat across elements, so each spelling is lowercased and looked up only once
+        postings_by_keyword = {}
+        
+        coverage_summary = []
+        key_exclusions = []
+        key_definitions = []
+        monetary_provisions = []
+        reporting_obligations = []
         
         for element in elements:
+            element_id = element.get('id')
             element_type = element.get('type', 'OTHER')
+            text = element.get('text') or ''
             
-            if element_type not in counts:
-                counts[element_type] = 0
-                
-            counts[element_type] += 1
-        
-        # Add total count
-        counts['TOTAL'] = len(elements)
-        
-        return counts
-    
-    def _create_element_navigation(self, elements: List[Dict]) -> Dict:
-        """
-        Create navigation indices for elements.
-        
-        Args:
-            elements: List of elements
+            # Insight text is truncated at most once, and only for elements that appear in an insight
+            summary_text = None
             
-        Returns:
-            Navigation structure for elements
-        """
-        # Navigation by type
-        nav_by_type = {}
-        
-        for element in elements:
-            element_type = element.get('type', 'OTHER')
+            # Group elements by section
+            if group_by_section:
+                section_id = element.get('section_id')
+                if section_id:
+                    elements_by_section[section_id].append(element)
             
-            if element_type not in nav_by_type:
-                nav_by_type[element_type] = []
-                
+            # Count elements by type
+            counts[element_type] += 1
+            
+            # Navigation by type
             nav_by_type[element_type].append({
                 'id': element.get('id', ''),
-                'text': element.get('text', '')[:100] + ('...' if len(element.get('text', '')) > 100 else ''),
+                'text': _truncate(text, 100),
                 'subtype': element.get('subtype', ''),
                 'section_id': element.get('section_id', ''),
                 'confidence': element.get('confidence', 0.0)
             })
-        
-        # Navigation by relationship
-        relationship_graph = {}
-        
-        for element in elements:
-            element_id = element.get('id')
-            parent_id = element.get('parent_element_id')
-            child_ids = element.get('child_element_ids', [])
             
+            # Navigation by relationship
             if element_id:
-                relationship_graph[element_id] = {
-                    'parent': parent_id,
-                    'children': child_ids
+                relationships = {
+                    'parent': element.get('parent_element_id'),
+                    'children': element.get('child_element_ids', [])
                 }
                 
                 # Add other relationships if present
-                if element.get('references'):
-                    relationship_graph[element_id]['references'] = element.get('references')
-                if element.get('dependencies'):
-                    relationship_graph[element_id]['dependencies'] = element.get('dependencies')
-                if element.get('modifies'):
-                    relationship_graph[element_id]['modifies'] = element.get('modifies')
-                if element.get('modified_by'):
-                    relationship_graph[element_id]['modified_by'] = element.get('modified_by')
-        
-        # Create keyword index
-        keyword_index = self._create_keyword_index(elements)
-        
-        return {
-            'by_type': nav_by_type,
-            'relationships': relationship_graph,
-            'keywords': keyword_index
-        }
-    
-    def _create_keyword_index(self, elements: List[Dict]) -> Dict:
-        """
-        Create an index of elements by keyword.
-        
-        Args:
-            elements: List of elements
-            
-        Returns:
-            Keyword index
-        """
-        keyword_index = {}
-        
-        for element in elements:
-            # Skip elements without keywords
-            if not element.get('keywords'):
-                continue
+                for relationship_type in self._OPTIONAL_RELATIONSHIPS:
+                    related = element.get(relationship_type)
+                    if related:
+                        relationships[relationship_type] = related
                 
-            for keyword in element.get('keywords', []):
-                if keyword:
-                    keyword_lower = keyword.lower()
-                    if keyword_lower not in keyword_index:
-                        keyword_index[keyword_lower] = []
-                    
-                    keyword_index[keyword_lower].append({
-                        'id': element.get('id', ''),
-                        'type': element.get('type', 'OTHER')
-                    })
-        
-        return keyword_index
-    
-    def _add_elements_to_sections(self, document_map: Dict, elements_by_section: Dict) -> None:
-        """
-        Add elements to their respective sections in the document map.
-        
-        Args:
-            document_map: Document map to enhance
-            elements_by_section: Dictionary of elements grouped by section ID
-        """
-        def process_section(section):
-            section_id = section.get('id')
+                relationship_graph[element_id] = relationships
             
-            if section_id and section_id in elements_by_section:
-                section['elements'] = elements_by_section[section_id]
-            else:
-                section['elements'] = []
-            
-            # Process child sections recursively
-            if 'children' in section:
-                for child in section['children']:
-                    process_section(child)
-        
-        # Process all root sections
-        for section in document_map.get('sections', []):
-            process_section(section)
-    
-    def _generate_policy_insights(self, elements: List[Dict], document_map: Dict) -> Dict:
-        """
-        Generate insights about the policy based on extracted elements.
-        
-        Args:
-            elements: List of all elements
-            document_map: Original document map
-            
-        Returns:
-            Dictionary of policy insights
-        """
-        insights = {
-            'coverage_summary': self._generate_coverage_summary(elements),
-            'key_exclusions': self._identify_key_exclusions(elements),
-            'key_definitions': self._identify_key_definitions(elements),
-            'monetary_provisions': self._extract_monetary_provisions(elements),
-            'reporting_obligations': self._extract_reporting_obligations(elements)
-        }
-        
-        return insights
-    
-    def _generate_coverage_summary(self, elements: List[Dict]) -> List[Dict]:
-        """
-        Generate a summary of coverage grants in the policy.
-        
-        Args:
-            elements: List of elements
-            
-        Returns:
-            List of coverage summary items
-        """
-        coverage_elements = [e for e in elements if e.get('type') == 'COVERAGE_GRANT']
-        summary = []
-        
-        for element in coverage_elements:
-            # Skip elements with low confidence
-            if element.get('confidence', 0) < 0.7:
-                continue
-                
-            summary.append({
-                'id': element.get('id'),
-                'text': element.get('text')[:200] + ('...' if len(element.get('text', '')) > 200 else ''),
-                'subtype': element.get('subtype', ''),
-                'monetary_values': element.get('metadata', {}).get('monetary_values', []),
-                'has_conditions': element.get('metadata', {}).get('contains_condition', False)
-            })
+            # Index elements by keyword; all of an element's postings share one record
+            keywords = element.get('keywords')
+            if keywords:
+                posting = {
+                    'id': element.get('id', ''),
+                    'type': element_type
+                }
+                for keyword in keywords:
+                    if keyword:
+                        postings = postings_by_keyword.get(keyword)
+                        if postings is None:
+                            postings = postings_by_keyword[keyword] = keyword_index[keyword.lower()]
+                        postings.append(posting)
             
-        return summary
-    
-    def _identify_key_exclusions(self, elements: List[Dict]) -> List[Dict]:
-        """
-        Identify key exclusions in the policy.
-        
-        Args:
-            elements: List of elements
+            # Policy insights; the type-based insights are mutually exclusive, so one dispatch picks the bucket
+            metadata = element.get('metadata') or self._NO_METADATA
             
-        Returns:
-            List of key exclusions
-        """
-        exclusion_elements = [e for e in elements if e.get('type') == 'EXCLUSION']
-        key_exclusions = []
-        
-        for element in exclusion_elements:
-            # Skip elements with low confidence
-            if element.get('confidence', 0) < 0.7:
-                continue
+            # Most element types feed no type-based insight; one set lookup skips the comparisons below
+            if element_type in self._INSIGHT_ELEMENT_TYPES:
+                if element_type == 'COVERAGE_GRANT':
+                    # Skip elements with low confidence
+                    if element.get('confidence', 0) >= 0.7:
+                        summary_text = _truncate(text, 200)
+                        coverage_summary.append({
+                            'id': element_id,
+                            'text': summary_text,
+                            'subtype': element.get('subtype', ''),
+                            'monetary_values': metadata.get('monetary_values', []),
+                            'has_conditions': metadata.get('contains_condition', False)
+                        })
+                elif element_type == 'EXCLUSION':
+                    # Skip elements with low confidence
+                    if element.get('confidence', 0) >= 0.7:
+                        summary_text = _truncate(text, 200)
+                        key_exclusions.append({
+                            'id': element_id,
+                            'text': summary_text,
+                            'subtype': element.get('subtype', '')
+                        })
+                elif element_type == 'DEFINITION':
+                    # Extract the term being defined
+                    term_match = self._QUOTED_TERM_RE.search(text)
+                    term = term_match.group(1) if term_match else ""
                 
-            key_exclusions.append({
-                'id': element.get('id'),
-                'text': element.get('text')[:200] + ('...' if len(element.get('text', '')) > 200 else ''),
-                'subtype': element.get('subtype', '')
-            })
+                    if term:
+                        summary_text = _truncate(text, 200)
+                        key_definitions.append({
+                            'id': element_id,
+                            'term': term,
+                            'definition': summary_text
+                        })
+                elif element_type == 'REPORTING_OBLIGATION' or element_type == 'CONDITION':
+                    # Lowercase once for the reporting and time-sensitivity checks
+                    text_lower = text.lower()
+                    if element_type == 'REPORTING_OBLIGATION' or 'report' in text_lower:
+                        summary_text = _truncate(text, 200)
+                        reporting_obligations.append({
+                            'id': element_id,
+                            'text': summary_text,
+                            'time_sensitive': 'day' in text_lower or 'immediate' in text_lower
+                        })
             
-        return key_exclusions
-    
-    def _identify_key_definitions(self, elements: List[Dict]) -> List[Dict]:
-        """
-        Identify key definitions in the policy.
-        
-        Args:
-            elements: List of elements
-            
-        Returns:
-            List of key definitions
-        """
-        definition_elements = [e for e in elements if e.get('type') == 'DEFINITION']
-        key_definitions = []
-        
-        for element in definition_elements:
-            # Extract the term being defined
-            import re
-            term_match = re.search(r'"([^"]*)"', element.get('text', ''))
-            term = term_match.group(1) if term_match else ""
-            
-            if term:
-                key_definitions.append({
-                    'id': element.get('id'),
-                    'term': term,
-                    'definition': element.get('text')[:200] + ('...' if len(element.get('text', '')) > 200 else '')
-                })
-            
-        return key_definitions
-    
-    def _extract_monetary_provisions(self, elements: List[Dict]) -> List[Dict]:
-        """
-        Extract provisions with monetary values.
-        
-        Args:
-            elements: List of elements
-            
-        Returns:
-            List of monetary provisions
-        """
-        monetary_provisions = []
-        
-        for element in elements:
-            metadata = element.get('metadata', {})
             if metadata.get('has_monetary_value') and metadata.get('monetary_values'):
+                if summary_text is None:
+                    summary_text = _truncate(text, 200)
                 monetary_provisions.append({
-                    'id': element.get('id'),
+                    'id': element_id,
                     'type': element.get('type'),
                     'subtype': element.get('subtype', ''),
-                    'text': element.get('text')[:200] + ('...' if len(element.get('text', '')) > 200 else ''),
+                    'text': summary_text,
                     'monetary_values': metadata.get('monetary_values', [])
                 })
-                
-        return monetary_provisions
+        
+        # Add total count
+        counts['TOTAL'] = len(elements)
+        
+        return {
+            'by_section': elements_by_section,
+            'counts': dict(counts),
+            'navigation': {
+                'by_type': dict(nav_by_type),
+                'relationships': relationship_graph,
+                'keywords': dict(keyword_index)
+            },
+            'insights': {
+                'coverage_summary': coverage_summary,
+                'key_exclusions': key_exclusions,
+                'key_definitions': key_definitions,
+                'monetary_provisions': monetary_provisions,
+                'reporting_obligations': reporting_obligations
+            }
+        }
     
-    def _extract_reporting_obligations(self, elements: List[Dict]) -> List[Dict]:
+    def _add_elements_to_sections(self, document_map: Dict, elements_by_section: Dict) -> None:
         """
-        Extract reporting obligations.
+        Add elements to their respective sections in the document map.
         
         Args:
-            elements: List of elements
-            
-        Returns:
-            List of reporting obligations
+            document_map: Document map to enhance
+            elements_by_section: Dictionary of elements grouped by section ID
         """
-        reporting_elements = [e for e in elements if e.get('type') == 'REPORTING_OBLIGATION' 
-                              or (e.get('type') == 'CONDITION' and 'report' in e.get('text', '').lower())]
-        obligations = []
+        # Walk the section tree with an explicit stack so deep nesting cannot hit the recursion limit
+        stack = list(document_map.get('sections', []))
         
-        for element in reporting_elements:
-            obligations.append({
-                'id': element.get('id'),
-                'text': element.get('text')[:200] + ('...' if len(element.get('text', '')) > 200 else ''),
-                'time_sensitive': 'day' in element.get('text', '').lower() or 'immediate' in element.get('text', '').lower()
-            })
+        while stack:
+            section = stack.pop()
+            section['elements'] = elements_by_section.get(section.get('id')) or []
             
-        return obligations
\ No newline at end of file
+            # Process child sections
+            children = section.get('children')
+            if children:
+                stack.extend(children)
\ No newline at end of file
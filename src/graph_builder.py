@@ -4,6 +4,7 @@ Graph builder module for the Policy DNA Extractor.
 This module builds a navigable relationship graph of policy elements.
 """
 
+from collections import Counter, deque
 from typing import Dict, List, Set, Tuple, Any, Optional
 
 class GraphBuilder:
@@ -37,14 +38,18 @@ class GraphBuilder:
         print(f"  Created {len(nodes)} nodes")
         
         print("  Creating relationship edges...")
-        edges = self._create_edges(references_data, dependencies_data, conflicts_data)
+        node_ids = {node['id'] for node in nodes}
+        edges = self._create_edges(references_data, dependencies_data, conflicts_data, node_ids)
         print(f"  Created {len(edges)} edges")
         
+        # Count incoming edges once for the connectivity metrics and the key elements
+        incoming_count = Counter(edge['target'] for edge in edges)
+        
         print("  Analyzing graph connectivity...")
-        connectivity_metrics = self._analyze_connectivity(nodes, edges)
+        connectivity_metrics = self._analyze_connectivity(nodes, edges, incoming_count)
         
         print("  Identifying key elements...")
-        key_elements = self._identify_key_elements(nodes, edges)
+        key_elements = self._identify_key_elements(nodes, incoming_count)
         print(f"  Identified {len(key_elements)} key elements")
         
         # Create the graph result
@@ -77,6 +82,11 @@ class GraphBuilder:
         nodes = []
         elements = document_map.get('elements', [])
         
+        # Index language analysis by element ID once; the first entry for an ID wins
+        language_by_id = {}
+        for lang_element in document_map.get('elements_with_language_analysis', []):
+            language_by_id.setdefault(lang_element.get('id'), lang_element)
+        
         for element in elements:
             element_id = element.get('id')
             
@@ -96,78 +106,92 @@ class GraphBuilder:
             }
             
             # Add language analysis if available
-            if 'elements_with_language_analysis' in document_map:
-                for lang_element in document_map['elements_with_language_analysis']:
-                    if lang_element.get('id') == element_id:
-                        # Add intent analysis
-                        if 'intent_analysis' in lang_element:
-                            node['intent'] = {
-                                'intent_summary': lang_element['intent_analysis'].get('intent_summary', ''),
-                                'coverage_effect': lang_element['intent_analysis'].get('coverage_effect', '')
-                            }
-                        
-                        # Add conditional analysis (summarized)
-                        if 'conditional_analysis' in lang_element:
-                            conditions = lang_element['conditional_analysis'].get('conditions', [])
-                            if conditions:
-                                node['conditions'] = {
-                                    'count': len(conditions),
-                                    'types': list(set(c.get('condition_type', '') for c in conditions if 'condition_type' in c))
-                                }
-                        
-                        break
+            lang_element = language_by_id.get(element_id)
+            if lang_element:
+                # Add intent analysis
+                if 'intent_analysis' in lang_element:
+                    node['intent'] = {
+                        'intent_summary': lang_element['intent_analysis'].get('intent_summary', ''),
+                        'coverage_effect': lang_element['intent_analysis'].get('coverage_effect', '')
+                    }
+                
+                # Add conditional analysis (summarized)
+                if 'conditional_analysis' in lang_element:
+                    conditions = lang_element['conditional_analysis'].get('conditions', [])
+                    if conditions:
+                        node['conditions'] = {
+                            'count': len(conditions),
+                            'types': list(set(c.get('condition_type', '') for c in conditions if 'condition_type' in c))
+                        }
             
             nodes.append(node)
         
         return nodes
     
-    def _create_edges(self, references_data: Dict, dependencies_data: Dict, conflicts_data: Dict) -> List[Dict]:
+    def _create_edges(self, references_data: Dict, dependencies_data: Dict, conflicts_data: Dict, node_ids: Set[str]) -> List[Dict]:
         """
         Create edges from references, dependencies, and conflicts.
         
+        Edges are only created between elements that have a node in the graph.
+        
         Args:
             references_data: Output from ReferenceDetector
             dependencies_data: Output from DependencyAnalyzer
             conflicts_data: Output from ConflictIdentifier
+            node_ids: IDs of the graph's nodes
             
         Returns:
             List of edges
         """
         edges = []
+        # Source-target pairs already linked by a reference edge
+        reference_pairs = set()
         
-        # Add reference edges
+        # Keep the most confident reference per source, target and reference type,
+        # so repeated citations of the same target produce a single edge
+        strongest_references = {}
         for ref in references_data.get('references', []):
             source_id = ref.get('source_id')
             target_id = ref.get('target_id')
             
-            if not source_id or not target_id:
+            if source_id not in node_ids or target_id not in node_ids:
                 continue
-                
+            
+            key = (source_id, target_id, ref.get('reference_type', 'unknown'))
+            current = strongest_references.get(key)
+            
+            # Earlier reference wins ties
+            if current is None or ref.get('confidence', 0.5) > current.get('confidence', 0.5):
+                strongest_references[key] = ref
+        
+        # Add reference edges
+        for (source_id, target_id, _), ref in strongest_references.items():
             edge = {
-                'id': ref.get('reference_id', f"REF-{len(edges):04d}"),
+                'id': ref['reference_id'] if 'reference_id' in ref else f"REF-{len(edges):04d}",
                 'source': source_id,
                 'target': target_id,
                 'type': 'reference',
                 'subtype': ref.get('reference_type', 'unknown'),
-                'text': ref.get('reference_text', '')[:100] if 'reference_text' in ref else '',
+                'text': ref['reference_text'][:100] if 'reference_text' in ref else '',
                 'weight': ref.get('confidence', 0.5),
                 'metadata': {}
             }
             
             edges.append(edge)
+            reference_pairs.add((source_id, target_id))
         
         # Add dependency edges
         for dep in dependencies_data.get('dependencies', []):
             source_id = dep.get('source_id')
             target_id = dep.get('target_id')
             
-            if not source_id or not target_id:
+            if source_id not in node_ids or target_id not in node_ids:
                 continue
                 
             # Check if this dependency duplicates a reference
-            if not any(e['source'] == source_id and e['target'] == target_id and e['type'] == 'reference' for e in edges):
+            if (source_id, target_id) not in reference_pairs:
                 edge = {
-                    'id': dep.get('dependency_id', f"DEP-{len(edges):04d}"),
+                    'id': dep['dependency_id'] if 'dependency_id' in dep else f"DEP-{len(edges):04d}",
                     'source': source_id,
                     'target': target_id,
                     'type': 'dependency',
@@ -182,25 +206,38 @@ class GraphBuilder:
         
         # Add conflict edges
         for conflict in conflicts_data.get('conflicts', []):
-            conflict_id = conflict.get('conflict_id', f"CONF-{len(edges):04d}")
+            conflict_id = conflict['conflict_id'] if 'conflict_id' in conflict else f"CONF-{len(edges):04d}"
             
             # Get conflicting elements
             elements = conflict.get('conflicting_elements', [])
             if not elements or len(elements) < 2:
                 continue
                 
-            # Create edges between all conflicting elements
-            for i, element1 in enumerate(elements):
-                for element2 in elements[i+1:]:
+            # Read the conflict's shared fields once for all of its pairwise edges
+            element_ids = [element.get('element_id') for element in elements]
+            subtype = conflict.get('conflict_type', 'unknown')
+            weight = conflict.get('severity', 0.5)
+            description = conflict.get('description', '')
+            
+            # Create edges between all conflicting elements; edge IDs number the source element
+            for i, source_id in enumerate(element_ids):
+                if source_id not in node_ids:
+                    continue
+                
+                edge_id = f"{conflict_id}-{i}"
+                for target_id in element_ids[i+1:]:
+                    if target_id not in node_ids:
+                        continue
+                    
                     edge = {
-                        'id': f"{conflict_id}-{i}",
-                        'source': element1.get('element_id'),
-                        'target': element2.get('element_id'),
+                        'id': edge_id,
+                        'source': source_id,
+                        'target': target_id,
                         'type': 'conflict',
-                        'subtype': conflict.get('conflict_type', 'unknown'),
-                        'weight': conflict.get('severity', 0.5),
+                        'subtype': subtype,
+                        'weight': weight,
                         'metadata': {
-                            'description': conflict.get('description', '')
+                            'description': description
                         }
                     }
                     
@@ -208,13 +245,14 @@ class GraphBuilder:
         
         return edges
     
-    def _analyze_connectivity(self, nodes: List[Dict], edges: List[Dict]) -> Dict:
+    def _analyze_connectivity(self, nodes: List[Dict], edges: List[Dict], incoming_count: Dict[str, int]) -> Dict:
         """
         Analyze the connectivity of the graph.
         
         Args:
             nodes: List of nodes
             edges: List of edges
+            incoming_count: Number of edges targeting each element ID
             
         Returns:
             Dictionary of connectivity metrics
@@ -224,16 +262,17 @@ class GraphBuilder:
         for node in nodes:
             graph[node['id']] = []
         
+        # Edges built by _create_edges always carry both endpoints
         for edge in edges:
-            source = edge.get('source')
-            target = edge.get('target')
+            source = edge['source']
+            target = edge['target']
             
             if source in graph and target in graph:
                 graph[source].append(target)
         
         # Calculate connectivity metrics
         total_nodes = len(nodes)
-        isolated_nodes = sum(1 for node_id, connections in graph.items() if not connections and not any(edge['target'] == node_id for edge in edges))
+        isolated_nodes = sum(1 for node_id, connections in graph.items() if not connections and node_id not in incoming_count)
         
         # Find connected components
         components = self._find_connected_components(graph)
@@ -258,44 +297,37 @@ class GraphBuilder:
         visited = set()
         components = []
         
-        def dfs(node, component):
-            visited.add(node)
-            component.add(node)
-            
-            for neighbor in graph.get(node, []):
-                if neighbor not in visited:
-                    dfs(neighbor, component)
-        
-        # Find components using DFS
+        # Find components using DFS with an explicit stack so long chains cannot hit the recursion limit
         for node in graph:
             if node not in visited:
                 component = set()
-                dfs(node, component)
+                visited.add(node)
+                stack = [node]
+                
+                while stack:
+                    current = stack.pop()
+                    component.add(current)
+                    
+                    for neighbor in graph.get(current, []):
+                        if neighbor not in visited:
+                            visited.add(neighbor)
+                            stack.append(neighbor)
+                
                 components.append(component)
         
         return components
     
-    def _identify_key_elements(self, nodes: List[Dict], edges: List[Dict]) -> List[Dict]:
+    def _identify_key_elements(self, nodes: List[Dict], incoming_count: Dict[str, int]) -> List[Dict]:
         """
         Identify key elements in the graph based on connectivity.
         
         Args:
             nodes: List of nodes
-            edges: List of edges
+            incoming_count: Number of edges targeting each element ID
             
         Returns:
             List of key elements with metrics
         """
-        # Count incoming references for each node
-        incoming_count = {}
-        for node in nodes:
-            incoming_count[node['id']] = 0
-        
-        for edge in edges:
-            target = edge.get('target')
-            if target in incoming_count:
-                incoming_count[target] += 1
-        
         # Create list of key elements with metrics
         key_elements = []
         for node in nodes:
@@ -327,6 +359,10 @@ class GraphBuilder:
         Returns:
             Dictionary containing the path and metadata
         """
+        # An element is trivially connected to itself
+        if start_id == end_id:
+            return self._construct_path_result([start_id], {}, graph_data.get('nodes', []))
+        
         # Build adjacency list
         graph = {}
         edges_by_pair = {}
@@ -339,6 +375,10 @@ class GraphBuilder:
             target = edge.get('target')
             
             if source in graph and target in graph:
+                # A direct edge is always the shortest path, so stop before building the rest of the graph
+                if source == start_id and target == end_id:
+                    return self._construct_path_result([start_id, end_id], {(source, target): [edge]}, graph_data.get('nodes', []))
+                
                 graph[source].append(target)
                 
                 # Store edge data for path reconstruction
@@ -347,23 +387,27 @@ class GraphBuilder:
                     edges_by_pair[edge_key] = []
                 edges_by_pair[edge_key].append(edge)
         
-        # Find path using BFS
-        visited = set()
-        queue = [(start_id, [])]
-        visited.add(start_id)
+        # Find path using BFS, remembering each node's predecessor instead of copying paths
+        parents = {start_id: None}
+        queue = deque([start_id])
         
         while queue:
-            node, path = queue.pop(0)
+            node = queue.popleft()
             
             # Check if we've reached the destination
             if node == end_id:
-                return self._construct_path_result(path + [node], edges_by_pair, graph_data.get('nodes', []))
+                path = [node]
+                while parents[node] is not None:
+                    node = parents[node]
+                    path.append(node)
+                path.reverse()
+                return self._construct_path_result(path, edges_by_pair, graph_data.get('nodes', []))
             
             # Explore neighbors
             for neighbor in graph.get(node, []):
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append((neighbor, path + [node]))
+                if neighbor not in parents:
+                    parents[neighbor] = node
+                    queue.append(neighbor)
         
         # No path found
         return {
@@ -385,13 +429,9 @@ class GraphBuilder:
         Returns:
             Path result dictionary
         """
-        # Find nodes in the path
-        path_nodes = []
-        for node_id in path:
-            for node in nodes:
-                if node['id'] == node_id:
-                    path_nodes.append(node)
-                    break
+        # Find nodes in the path; the first node with a given ID wins, as with a linear scan
+        nodes_by_id = {node['id']: node for node in reversed(nodes)}
+        path_nodes = [nodes_by_id[node_id] for node_id in path if node_id in nodes_by_id]
         
         # Find edges in the path
         path_edges = []
@@ -428,43 +468,40 @@ class GraphBuilder:
         nodes = {node['id']: node for node in graph_data.get('nodes', [])}
         
         dependencies = []
+        # Dependencies grouped by relationship type, filled in the same pass
+        grouped = {}
         
-        for edge in graph_data.get('edges', []):
-            source = edge.get('source')
-            target = edge.get('target')
-            
-            if direction == 'outgoing' and source == element_id:
-                if target in nodes:
-                    dependencies.append({
-                        'element_id': target,
-                        'element_type': nodes[target].get('type', 'UNKNOWN'),
-                        'element_text': nodes[target].get('text', '')[:100],
-                        'relationship': {
-                            'type': edge.get('type', 'unknown'),
-                            'subtype': edge.get('subtype', 'unknown'),
-                            'weight': edge.get('weight', 0.5)
-                        }
-                    })
-            elif direction == 'incoming' and target == element_id:
-                if source in nodes:
-                    dependencies.append({
-                        'element_id': source,
-                        'element_type': nodes[source].get('type', 'UNKNOWN'),
-                        'element_text': nodes[source].get('text', '')[:100],
-                        'relationship': {
-                            'type': edge.get('type', 'unknown'),
-                            'subtype': edge.get('subtype', 'unknown'),
-                            'weight': edge.get('weight', 0.5)
-                        }
-                    })
+        # Resolve the direction once: which edge end must be the element, and which end is reported
+        edges = graph_data.get('edges', [])
+        if direction == 'outgoing':
+            element_end, related_end = 'source', 'target'
+        elif direction == 'incoming':
+            element_end, related_end = 'target', 'source'
+        else:
+            # Unknown directions match no edges
+            edges = []
         
-        # Group by relationship type
-        grouped = {}
-        for dep in dependencies:
-            rel_type = dep['relationship']['type']
-            if rel_type not in grouped:
-                grouped[rel_type] = []
-            grouped[rel_type].append(dep)
+        for edge in edges:
+            if edge.get(element_end) != element_id:
+                continue
+            
+            related_id = edge.get(related_end)
+            if related_id in nodes:
+                related_node = nodes[related_id]
+                rel_type = edge.get('type', 'unknown')
+                dependency = {
+                    'element_id': related_id,
+                    'element_type': related_node.get('type', 'UNKNOWN'),
+                    'element_text': related_node.get('text', '')[:100],
+                    'relationship': {
+                        'type': rel_type,
+                        'subtype': edge.get('subtype', 'unknown'),
+                        'weight': edge.get('weight', 0.5)
+                    }
+                }
+                
+                dependencies.append(dependency)
+                grouped.setdefault(rel_type, []).append(dependency)
         
         return {
             'element_id': element_id,
@@ -2,22 +2,38 @@
 Intent analyzer module for determining coverage intent of policy elements.
 """
 
+import copy
 import json
 import re
 from typing import Dict, List, Optional, Any
+from src.llm_response import call_concurrently, parse_json_response
+from src.result_cache import ResultCache
 
 class IntentAnalyzer:
     """Analyzes policy elements to determine coverage intent."""
     
-    def __init__(self, llm_client):
+    _QUOTED_TERM_RE = re.compile(r'"([^"]*)"')
+    _DAMAGES_BECAUSE_OF_RE = re.compile(r'damages because of\s*["\']?([^"\']*)["\']?')
+    _PAY_FOR_RE = re.compile(r'pay for\s*["\']?([^"\']*)["\']?')
+    _CAUSED_BY_RE = re.compile(r'caused by\s*["\']?([^"\']*)["\']?')
+    _IF_CONDITION_RE = re.compile(r'if\s*([^.]*)')
+    
+    # Element types with intent heuristics
+    _HEURISTIC_ELEMENT_TYPES = frozenset({'COVERAGE_GRANT', 'EXCLUSION', 'DEFINITION'})
+    
+    def __init__(self, llm_client, cache_dir: Optional[str] = None, max_concurrent_requests: int = 8):
         """
         Initialize the intent analyzer.
         
         Args:
             llm_client: Client for the LLM
+            cache_dir: Directory for cached intent analyses (None disables caching)
+            max_concurrent_requests: Maximum number of intent analysis requests in flight at once
         """
         self.llm_client = llm_client
         self.prompts = self._load_prompts()
+        self.cache = ResultCache(cache_dir) if cache_dir else None
+        self.max_concurrent_requests = max_concurrent_requests
     
     def _load_prompts(self):
         """Load prompt templates for intent analysis."""
@@ -28,14 +44,6 @@ class IntentAnalyzer:
             ## Your Task
             Analyze the insurance policy element below and determine its precise coverage intent - what it means to cover or exclude, under what circumstances, and with what limitations.
             
-            ## Element Information
-            Text: ```
-            {element_text}
-            ```
-            
-            Type: {element_type}
-            Subtype: {element_subtype}
-            
             ## Expected Output Format
             Provide your analysis as a JSON object:
             ```json
@@ -62,6 +70,14 @@ class IntentAnalyzer:
             - If this is an exclusion, specify what is being excluded and under what circumstances
             - For definitions, explain how the definition impacts coverage interpretation
             
+            ## Element Information
+            Text: ```
+            {element_text}
+            ```
+            
+            Type: {element_type}
+            Subtype: {element_subtype}
+            
             Return only the JSON object with no additional text.
             """
         }
@@ -77,11 +93,15 @@ class IntentAnalyzer:
             Elements with added intent analysis
         """
         enhanced_elements = []
+        # Elements left for the LLM, grouped by the text, type and subtype that make up the prompt
+        llm_groups = {}
         
         for element in elements:
             try:
+                element_text = element.get('text')
+                
                 # Skip analysis for elements with insufficient text
-                if not element.get('text') or len(element.get('text', '')) < 10:
+                if not element_text or len(element_text) < 10:
                     element['intent_analysis'] = {
                         "intent_summary": "Insufficient text for intent analysis",
                         "coverage_effect": "UNKNOWN",
@@ -97,48 +117,77 @@ class IntentAnalyzer:
                     continue
                 
                 # Apply heuristic analysis first
-                heuristic_intent = self._apply_intent_heuristics(element)
+                heuristic_intent = self._apply_intent_heuristics(element, element_text)
                 if heuristic_intent and heuristic_intent.get('intent_confidence', 0) > 0.8:
                     element['intent_analysis'] = heuristic_intent
                     enhanced_elements.append(element)
                     continue
                 
-                # Use LLM for more complex analysis
-                intent_analysis = self._analyze_element_intent(
-                    element.get('text', ''),
-                    element.get('type', 'UNKNOWN'),
-                    element.get('subtype', '')
-                )
-                
-                element['intent_analysis'] = intent_analysis
+                # Leave more complex analysis to the LLM below; repeated clauses share one request
+                llm_key = (element_text, element.get('type', 'UNKNOWN'), element.get('subtype', ''))
+                llm_groups.setdefault(llm_key, []).append(element)
                 enhanced_elements.append(element)
                 
             except Exception as e:
-                print(f"Error analyzing intent for element: {str(e)}")
-                # Add default intent analysis in case of error
-                element['intent_analysis'] = {
-                    "intent_summary": f"Error during intent analysis: {str(e)}",
-                    "coverage_effect": "UNKNOWN",
-                    "intent_details": {},
-                    "intent_confidence": 0.0
-                }
+                self._set_fallback_intent(element, e)
                 enhanced_elements.append(element)
         
+        # Use LLM for more complex analysis; the longest clauses start first so a long request does not run alone at the end
+        llm_keys = sorted(llm_groups, key=lambda llm_key: len(llm_key[0]), reverse=True)
+        outcomes = call_concurrently(self._analyze_element_intent, llm_keys, self.max_concurrent_requests)
+        
+        for llm_key, (intent_analysis, error) in zip(llm_keys, outcomes):
+            group = llm_groups[llm_key]
+            if error is not None:
+                for element in group:
+                    self._set_fallback_intent(element, error)
+                continue
+            
+            # Give every element its own copy so later edits stay local to that element
+            group[0]['intent_analysis'] = intent_analysis
+            for element in group[1:]:
+                element['intent_analysis'] = copy.deepcopy(intent_analysis)
+        
         return enhanced_elements
     
-    def _apply_intent_heuristics(self, element: Dict) -> Optional[Dict]:
+    def _set_fallback_intent(self, element: Dict, error: Exception) -> None:
+        """
+        Record a default intent analysis after an analysis error.
+        
+        Args:
+            element: The element whose analysis failed
+            error: The error raised while analyzing it
+        """
+        print(f"Error analyzing intent for element: {str(error)}")
+        # Add default intent analysis in case of error
+        element['intent_analysis'] = {
+            "intent_summary": f"Error during intent analysis: {str(error)}",
+            "coverage_effect": "UNKNOWN",
+            "intent_details": {},
+            "intent_confidence": 0.0
+        }
+    
+    def _apply_intent_heuristics(self, element: Dict, element_text: Optional[str] = None) -> Optional[Dict]:
         """
         Apply heuristics to determine intent for common element patterns.
         
         Args:
             element: The element to analyze
+            element_text: The element's text, if already read by the caller
             
         Returns:
             Intent analysis if heuristics match, None otherwise
         """
-        element_text = element.get('text', '').lower()
         element_type = element.get('type', '')
         
+        # Only a few element types have heuristics; lowercase the text just for those
+        if element_type not in self._HEURISTIC_ELEMENT_TYPES:
+            return None
+        
+        if element_text is None:
+            element_text = element.get('text', '')
+        element_text = element_text.lower()
+        
         # Coverage grant heuristics
         if element_type == 'COVERAGE_GRANT':
             if 'we will pay' in element_text or 'the company will pay' in element_text:
@@ -173,7 +222,7 @@ class IntentAnalyzer:
         
         # Definition heuristics
         if element_type == 'DEFINITION':
-            term_match = re.search(r'"([^"]*)"', element_text)
+            term_match = self._QUOTED_TERM_RE.search(element_text)
             if term_match and ' means ' in element_text:
                 term = term_match.group(1)
                 return {
@@ -201,12 +250,12 @@ class IntentAnalyzer:
         """
         # Try to extract what is being covered from common patterns
         if 'damages because of' in text:
-            match = re.search(r'damages because of\s*["\']?([^"\']*)["\']?', text)
+            match = self._DAMAGES_BECAUSE_OF_RE.search(text)
             if match:
                 return match.group(1).strip()
         
         if 'pay for' in text:
-            match = re.search(r'pay for\s*["\']?([^"\']*)["\']?', text)
+            match = self._PAY_FOR_RE.search(text)
             if match:
                 return match.group(1).strip()
         
@@ -226,13 +275,13 @@ class IntentAnalyzer:
         
         # Look for 'caused by' pattern
         if 'caused by' in text:
-            match = re.search(r'caused by\s*["\']?([^"\']*)["\']?', text)
+            match = self._CAUSED_BY_RE.search(text)
             if match:
                 triggers.append(match.group(1).strip())
         
         # Look for 'if' conditions
         if ' if ' in text:
-            match = re.search(r'if\s*([^.]*)', text)
+            match = self._IF_CONDITION_RE.search(text)
             if match:
                 triggers.append(match.group(1).strip())
         
@@ -257,13 +306,23 @@ class IntentAnalyzer:
             element_subtype=element_subtype
         )
         
+        # The prompt embeds the element text, type, subtype and the template, so it identifies the result
+        cache_key = ResultCache.make_key(prompt) if self.cache else None
+        if cache_key:
+            intent_analysis = self.cache.get(cache_key)
+            if intent_analysis is not None:
+                return intent_analysis
+        
         # Call LLM with prompt
         response = self.llm_client.generate(prompt)
         
         # Parse the response
         try:
-            cleaned_response = self._clean_json_response(response)
-            intent_analysis = json.loads(cleaned_response)
+            intent_analysis = parse_json_response(response)
+            
+            if cache_key:
+                self.cache.set(cache_key, intent_analysis)
+            
             return intent_analysis
         except json.JSONDecodeError as e:
             print(f"Error parsing intent analysis response: {str(e)}")
@@ -275,24 +334,4 @@ class IntentAnalyzer:
                 "coverage_effect": "UNKNOWN",
                 "intent_details": {},
                 "intent_confidence": 0.0
-            }
-    
-    def _clean_json_response(self, response: str) -> str:
-        """
-        Clean LLM response to extract valid JSON.
-        
-        Args:
-            response: Raw LLM response
-            
-        Returns:
-            Cleaned JSON string
-        """
-        response = response.strip()
-        
-        # Remove markdown code blocks if present
-        if response.startswith('```json') and response.endswith('```'):
-            response = response[7:-3].strip()
-        elif response.startswith('```') and response.endswith('```'):
-            response = response[3:-3].strip()
-            
-        return response
\ No newline at end of file
+            }
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""
+Helpers for building LLM prompts, issuing LLM requests and handling raw LLM responses.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from string import Formatter
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+# Faster JSON parsing when available; its JSONDecodeError subclasses json's, so handlers are shared
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def split_prompt_template(template: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """
+    Split a str.format prompt template into literal text and field names.
+    
+    Splitting once lets prompts be assembled by joining strings instead of
+    re-parsing the whole template on every call.
+    
+    Args:
+        template: Prompt template using str.format placeholders
+        
+    Returns:
+        Tuple of (literal text, field name or None) pairs
+        
+    Raises:
+        ValueError: If a placeholder uses a conversion or format spec
+    """
+    parts = []
+    for literal, field_name, format_spec, conversion in Formatter().parse(template):
+        if format_spec or conversion:
+            raise ValueError(f"Unsupported placeholder in prompt template: {field_name}")
+        parts.append((literal, field_name))
+    return tuple(parts)
+
+def fill_prompt_template(parts: Tuple[Tuple[str, Optional[str]], ...], **values) -> str:
+    """
+    Assemble a prompt from a split template.
+    
+    Args:
+        parts: Template parts from split_prompt_template
+        **values: Values for the template fields
+        
+    Returns:
+        The filled-in prompt, identical to str.format on the original template
+    """
+    return "".join([
+        literal if field_name is None else literal + str(values[field_name])
+        for literal, field_name in parts
+    ])
+
+def call_concurrently(func: Callable, calls: Sequence[Tuple], max_concurrent_requests: int) -> List[Tuple[Any, Optional[Exception]]]:
+    """
+    Run blocking LLM request functions with a bounded number in flight.
+    
+    Each call blocks on a network round-trip, so requests are issued from a
+    thread pool instead of one after another.
+    
+    Args:
+        func: Function issuing one request
+        calls: Argument tuples, one per call
+        max_concurrent_requests: Maximum number of calls running at once
+        
+    Returns:
+        (result, error) pairs in call order; error is None for successful calls
+    """
+    if not calls:
+        return []
+    
+    outcomes = []
+    with ThreadPoolExecutor(max_workers=min(max_concurrent_requests, len(calls))) as executor:
+        futures = [executor.submit(func, *args) for args in calls]
+        
+        for future in futures:
+            try:
+                outcomes.append((future.result(), None))
+            except Exception as e:
+                outcomes.append((None, e))
+    
+    return outcomes
+
+def clean_json_response(response: str) -> str:
+    """
+    Clean LLM response to extract valid JSON.
+    
+    Args:
+        response: Raw LLM response
+        
+    Returns:
+        Cleaned JSON string
+    """
+    response = response.strip()
+    
+    # Remove markdown code blocks if present
+    if response.endswith('```'):
+        if response.startswith('```json'):
+            return response[7:-3].strip()
+        if response.startswith('```'):
+            return response[3:-3].strip()
+    
+    return response
+
+def parse_json_response(response: str) -> Any:
+    """
+    Parse the JSON payload of an LLM response.
+    
+    Code fences are stripped first. orjson is used when installed; its
+    JSONDecodeError subclasses json's, so callers catch json.JSONDecodeError.
+    
+    Args:
+        response: Raw LLM response
+        
+    Returns:
+        The parsed JSON value
+        
+    Raises:
+        json.JSONDecodeError: If the response is not valid JSON
+    """
+    cleaned_response = clean_json_response(response)
+    return orjson.loads(cleaned_response) if orjson else json.loads(cleaned_response)
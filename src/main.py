@@ -22,7 +22,7 @@ from src.document_mapper import DocumentMapper
 from src.element_extractor import ElementExtractor
 from src.element_classifier import ElementClassifier
 from src.relationship_analyzer import ElementRelationshipAnalyzer
-from src.element_mapper import ElementMapper
+from src.element_mapper import ElementMapper, index_elements_by_id
 from src.intent_analyzer import IntentAnalyzer
 from src.conditional_language_detector import ConditionalLanguageDetector
 from src.term_extractor import TermExtractor
@@ -40,6 +40,27 @@ from src.taxonomy.language_normalizer import StandardClauseLibrary, LanguageNorm
 from src.taxonomy.policy_structure_builder import PolicyStructureBuilder
 from src.taxonomy.taxonomy_visualizer import TaxonomyVisualizer
 
+# Faster JSON serialization of the (large) output maps when available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _write_json(data, output_path: str) -> None:
+    """
+    Write data to a JSON file with two-space indentation.
+    
+    Args:
+        data: JSON-serializable data to write
+        output_path: Path of the output file
+    """
+    if orjson:
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(output_path, 'w') as f:
+            json.dump(data, f, indent=2)
+
 class PolicyDNAExtractor:
     """Main orchestrator for policy DNA extraction."""
     
@@ -62,13 +83,22 @@ class PolicyDNAExtractor:
         self.document_mapper = DocumentMapper()
         
         # Initialize element processing components
-        self.element_extractor = ElementExtractor(self.llm_client)
-        self.element_classifier = ElementClassifier(self.llm_client)
+        # Cached LLM results are kept per model so switching models never reuses stale answers
+        element_cache_dir = self.config.element_extraction.cache_dir
+        if element_cache_dir:
+            element_cache_dir = os.path.join(element_cache_dir, self.config.llm.model)
+        
+        self.element_extractor = ElementExtractor(self.llm_client, element_cache_dir)
+        self.element_classifier = ElementClassifier(
+            self.llm_client, element_cache_dir, self.config.llm.max_concurrent_requests
+        )
         self.relationship_analyzer = ElementRelationshipAnalyzer(self.llm_client)
         self.element_mapper = ElementMapper()
         
         # Initialize deep language analysis components
-        self.intent_analyzer = IntentAnalyzer(self.llm_client)
+        self.intent_analyzer = IntentAnalyzer(
+            self.llm_client, element_cache_dir, self.config.llm.max_concurrent_requests
+        )
         self.conditional_language_detector = ConditionalLanguageDetector(self.llm_client)
         self.term_extractor = TermExtractor(self.llm_client)
         self.language_mapper = LanguageMapper()
@@ -273,12 +303,15 @@ class PolicyDNAExtractor:
             # Create empty references if error occurs
             references = []
         
+        # Index elements once for dependency and conflict analysis
+        elements_by_id = index_elements_by_id(language_document_map.get('elements', []))
+        
         # Step 14: Analyze dependencies
         print("Step 14: Analyzing logical dependencies...")
         dependencies = []
         
         try:
-            dependencies = self.dependency_analyzer.analyze_dependencies(language_document_map, references)
+            dependencies = self.dependency_analyzer.analyze_dependencies(language_document_map, references, elements_by_id)
             if self.config.debug_mode:
                 self._save_intermediate_result(dependencies, document_path, "analyzed_dependencies")
         except Exception as e:
@@ -291,7 +324,7 @@ class PolicyDNAExtractor:
         conflicts = []
         
         try:
-            conflicts = self.conflict_identifier.identify_conflicts(language_document_map, dependencies)
+            conflicts = self.conflict_identifier.identify_conflicts(language_document_map, dependencies, elements_by_id)
             if self.config.debug_mode:
                 self._save_intermediate_result(conflicts, document_path, "identified_conflicts")
         except Exception as e:
@@ -588,8 +621,7 @@ class PolicyDNAExtractor:
         output_path = os.path.join(self.config.output_dir, f"{file_name}_policy_dna.json")
         
         # Save document map as JSON
-        with open(output_path, 'w') as f:
-            json.dump(document_map, f, indent=2)
+        _write_json(document_map, output_path)
             
         return output_path
     
@@ -609,8 +641,7 @@ class PolicyDNAExtractor:
         
         output_path = os.path.join(debug_dir, f"{file_name}_{stage_name}.json")
         
-        with open(output_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        _write_json(data, output_path)
             
         print(f"Saved intermediate result to: {output_path}")
     
@@ -854,11 +885,14 @@ class PolicyDNAExtractor:
             # Detect references
             references = self.reference_detector.detect_references(document_map)
             
+            # Index elements once for dependency and conflict analysis
+            elements_by_id = index_elements_by_id(document_map.get('elements', []))
+            
             # Analyze dependencies
-            dependencies = self.dependency_analyzer.analyze_dependencies(document_map, references)
+            dependencies = self.dependency_analyzer.analyze_dependencies(document_map, references, elements_by_id)
             
             # Identify conflicts
-            conflicts = self.conflict_identifier.identify_conflicts(document_map, dependencies)
+            conflicts = self.conflict_identifier.identify_conflicts(document_map, dependencies, elements_by_id)
             
             # Build graph
             graph_result = self.graph_builder.build_graph(document_map, references, dependencies, conflicts)
@@ -953,6 +987,7 @@ def main():
     parser.add_argument("--skip-relationships", action="store_true", help="Skip relationship analysis")
     parser.add_argument("--phase", type=int, choices=[1, 2, 3, 4, 5], help="Run specific phase (1-5)")
     parser.add_argument("--input", help="Input JSON file for specific phase")
+    parser.add_argument("--cache-dir", help="Directory for caching parse and LLM results between runs (e.g. ~/.cache/coversight)")
     
     args = parser.parse_args()
     
@@ -968,6 +1003,10 @@ def main():
     if args.skip_relationships:
         config.element_extraction.analyze_relationships = False
     
+    if args.cache_dir:
+        config.parser.cache_dir = args.cache_dir
+        config.element_extraction.cache_dir = os.path.join(args.cache_dir, "elements")
+    
     # Create and run the extractor
     extractor = PolicyDNAExtractor(config)
     
@@ -996,8 +1035,7 @@ def main():
             output_path = os.path.join(config.output_dir, f"{file_name}_phase{args.phase}_result.json")
             
             # Save result
-            with open(output_path, 'w') as f:
-                json.dump(result, f, indent=2)
+            _write_json(result, output_path)
                 
             print(f"Phase {args.phase} completed. Result saved to: {output_path}")
             
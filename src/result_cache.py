@@ -0,0 +1,99 @@
+"""
+Result cache module for persisting parse and LLM results between runs.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from typing import Any, Optional
+
+class ResultCache:
+    """Disk cache of JSON-serializable results, stored as one file per key."""
+
+    def __init__(self, cache_dir: str):
+        """
+        Initialize the result cache.
+
+        Args:
+            cache_dir: Directory holding the cache entries ("~" is expanded)
+        """
+        self.cache_dir = os.path.expanduser(cache_dir)
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """
+        Build a cache key from the inputs that determine a result.
+
+        Args:
+            *parts: Strings identifying the result
+
+        Returns:
+            Hex digest usable as a cache key
+        """
+        key_hash = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            encoded = part.encode('utf-8')
+            # Length-prefix each part so different splits never produce the same key
+            key_hash.update(len(encoded).to_bytes(8, 'little'))
+            key_hash.update(encoded)
+        return key_hash.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Load a cached result.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached result, or None if there is no usable entry
+        """
+        cache_path = self._get_path(key)
+        if not os.path.exists(cache_path):
+            return None
+
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  Error reading cache entry {cache_path}: {str(e)}")
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a result in the cache.
+
+        The entry is written to a temporary file and moved into place, so
+        concurrent writers never expose a partially written file.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable result to store
+        """
+        cache_path = self._get_path(key)
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(value, f)
+                os.replace(temp_path, cache_path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+        except (OSError, TypeError, ValueError) as e:
+            print(f"  Error writing cache entry {cache_path}: {str(e)}")
+
+    def _get_path(self, key: str) -> str:
+        """
+        Get the file path of a cache entry.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Path of the cache file
+        """
+        return os.path.join(self.cache_dir, f"{key}.json")
@@ -5,6 +5,7 @@ Term extractor module for identifying key terms, conditions, and triggers in pol
 import json
 import re
 from typing import Dict, List, Optional, Any
+from src.llm_response import clean_json_response
 
 class TermExtractor:
     """Extracts and categorizes specific terms and triggers in policy language."""
@@ -236,7 +237,7 @@ class TermExtractor:
         
         # Parse the response
         try:
-            cleaned_response = self._clean_json_response(response)
+            cleaned_response = clean_json_response(response)
             term_extraction = json.loads(cleaned_response)
             return term_extraction
         except json.JSONDecodeError as e:
@@ -251,24 +252,4 @@ class TermExtractor:
                 "monetary_terms": [],
                 "logical_operators": [],
                 "confidence": 0.0
-            }
-    
-    def _clean_json_response(self, response: str) -> str:
-        """
-        Clean LLM response to extract valid JSON.
-        
-        Args:
-            response: Raw LLM response
-            
-        Returns:
-            Cleaned JSON string
-        """
-        response = response.strip()
-        
-        # Remove markdown code blocks if present
-        if response.startswith('```json') and response.endswith('```'):
-            response = response[7:-3].strip()
-        elif response.startswith('```') and response.endswith('```'):
-            response = response[3:-3].strip()
-            
-        return response
\ No newline at end of file
+            }
\ No newline at end of file
@@ -66,4 +66,28 @@ def test_create_chunks():
     assert "longer" in text_from_chunks
     assert "multiple" in text_from_chunks
 
+def test_parse_document_cache(tmp_path, monkeypatch):
+    """Test that unchanged documents are served from the parse cache."""
+    test_file_path = tmp_path / 'policy.pdf'
+    test_file_path.write_bytes(b'%PDF-1.4 test content')
+    
+    parser = DocumentParser(ParserConfig(cache_dir=str(tmp_path / 'cache')))
+    calls = []
+    
+    def fake_parse_pdf(pdf_path):
+        calls.append(pdf_path)
+        return {'file_path': pdf_path, 'file_type': 'pdf', 'pages': [], 'full_text': "text", 'metadata': {}}
+    
+    monkeypatch.setattr(parser, '_parse_pdf', fake_parse_pdf)
+    
+    first = parser.parse_document(str(test_file_path))
+    second = parser.parse_document(str(test_file_path))
+    assert len(calls) == 1
+    assert second == first
+    
+    # Changing a chunking setting invalidates the cached entry
+    parser.config.chunk_size += 1
+    parser.parse_document(str(test_file_path))
+    assert len(calls) == 2
+
 # If you have actual PDFs or DOCXs to test with, you can add more tests
\ No newline at end of file
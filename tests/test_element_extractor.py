@@ -5,6 +5,7 @@ Tests for the element extractor module.
 import pytest
 from unittest.mock import MagicMock
 from src.element_extractor import ElementExtractor
+from src.llm_response import clean_json_response
 
 class MockLLMClient:
     """Mock LLM client for testing."""
@@ -131,27 +132,21 @@ def test_extract_elements_empty_section():
 
 def test_clean_json_response():
     """Test cleaning JSON responses."""
-    # Create mock LLM client
-    mock_client = MockLLMClient()
-    
-    # Initialize extractor
-    extractor = ElementExtractor(mock_client)
-    
     # Test with JSON code block
     json_with_block = """```json
     [{"key": "value"}]
     ```"""
-    cleaned = extractor._clean_json_response(json_with_block)
+    cleaned = clean_json_response(json_with_block)
     assert cleaned == '[{"key": "value"}]'
     
     # Test with generic code block
     json_with_generic_block = "```\n[1, 2, 3]\n```"
-    cleaned = extractor._clean_json_response(json_with_generic_block)
+    cleaned = clean_json_response(json_with_generic_block)
     assert cleaned == "[1, 2, 3]"
     
     # Test with plain JSON
     plain_json = '{"a": 1, "b": 2}'
-    cleaned = extractor._clean_json_response(plain_json)
+    cleaned = clean_json_response(plain_json)
     assert cleaned == '{"a": 1, "b": 2}'
 
 def test_parse_invalid_json():
@@ -178,4 +173,32 @@ def test_parse_invalid_json():
     elements = extractor.extract_elements(test_section)
     
     # Verify results
-    assert len(elements) == 0  # Should return empty list on parse error
\ No newline at end of file
+    assert len(elements) == 0  # Should return empty list on parse error
+
+def test_extract_elements_cache(tmp_path):
+    """Test that extraction results are reused for repeated section text."""
+    # Create mock LLM client
+    mock_client = MockLLMClient()
+    
+    # Initialize extractor with a cache directory
+    extractor = ElementExtractor(mock_client, cache_dir=str(tmp_path))
+    
+    # Create test section
+    test_section = {
+        'id': 'section_123',
+        'title': 'Test Section',
+        'text': 'Some test content',
+        'classification': {
+            'classification': 'OTHER'
+        }
+    }
+    
+    # Extract elements twice
+    first = extractor.extract_elements(test_section)
+    second = extractor.extract_elements(test_section)
+    
+    # Verify the LLM was called once and the cached elements get fresh IDs
+    assert len(mock_client.prompts) == 1
+    assert [e['text'] for e in second] == [e['text'] for e in first]
+    assert second[0]['id'] != first[0]['id']
+    assert second[0]['section_id'] == 'section_123'